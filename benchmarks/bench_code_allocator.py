@@ -0,0 +1,54 @@
+"""Film kodi ajratish vaqti katalog hajmiga bog'liq emasligini o'lchash.
+
+    python benchmarks/bench_code_allocator.py --movies 100000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--movies", type=int, default=100000)
+    parser.add_argument("--window", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DB_PATH"] = os.path.join(tmp, "bench.db")
+
+        import database
+
+        database.init_db()
+        conn = sqlite3.connect(os.environ["DB_PATH"])
+        conn.execute("PRAGMA synchronous=OFF")
+
+        codes = set()
+        window_start = time.perf_counter()
+        for i in range(1, args.movies + 1):
+            code = database.allocate_movie_code(conn=conn)
+            conn.execute(
+                "INSERT INTO movies (file_id, description, code) VALUES (?, ?, ?)",
+                ("file", f"Film {i}", code),
+            )
+            conn.commit()
+            codes.add(code)
+
+            if i % args.window == 0:
+                elapsed = time.perf_counter() - window_start
+                if i == args.window or i % (args.movies // 10 or 1) == 0:
+                    print(f"{i:>8} ta film: {elapsed / args.window * 1e6:8.1f} µs/kod, uzunlik {len(code)}")
+                window_start = time.perf_counter()
+
+        conn.close()
+        assert len(codes) == args.movies, "takroriy kod ajratildi"
+        print(f"✅ {len(codes)} ta noyob kod")
+
+
+if __name__ == "__main__":
+    main()
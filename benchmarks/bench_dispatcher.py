@@ -0,0 +1,257 @@
+"""main.py dagi haqiqiy dispatcher'ni soxta Telegram sessiyasi bilan yuklab sinash.
+
+Sintetik Update'lar (kod so'rovlari, /random, sahifalash tugmalari, kontaktlar)
+to'g'ridan-to'g'ri dp.feed_update ga beriladi, Bot API javoblari esa darhol
+qaytariladi. Natijalar JSON faylga yoziladi, shuning uchun turli ishga
+tushirishlarni solishtirish mumkin.
+
+    python benchmarks/bench_dispatcher.py --movies 5000 --users 20000 --updates 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from aiogram.client.session.base import BaseSession  # noqa: E402
+from aiogram.methods import AnswerCallbackQuery, GetChatMember, SendMediaGroup  # noqa: E402
+from aiogram.types import Chat, ChatMemberMember, Message, Update, User  # noqa: E402
+
+
+class FakeSession(BaseSession):
+    """Har bir Bot API so'roviga tarmoqsiz, darhol javob qaytaruvchi sessiya"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = defaultdict(int)
+        self._message_id = 0
+
+    async def make_request(self, bot, method, timeout=None):
+        self.calls[type(method).__name__] += 1
+
+        if isinstance(method, GetChatMember):
+            return ChatMemberMember(user=User(id=method.user_id, is_bot=False, first_name="u"), status="member")
+        if isinstance(method, AnswerCallbackQuery):
+            return True
+
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return True
+        if isinstance(method, SendMediaGroup):
+            return [self._message(chat_id) for _ in method.media]
+        return self._message(chat_id, getattr(method, "text", None))
+
+    def _message(self, chat_id, text=None):
+        self._message_id += 1
+        return Message(
+            message_id=self._message_id,
+            date=datetime.now(),
+            chat=Chat(id=chat_id, type="private"),
+            text=text,
+        )
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+def seed_database(path, movies, users, rng):
+    conn = sqlite3.connect(path)
+    genres = ["Drama", "Komediya", "Boevik", "Fantastika", "Triller", "Multfilm"]
+    rows = []
+    for i in range(movies):
+        title = f"🎬 Film {i}"
+        genre = rng.choice(genres)
+        description = f"{title}\n⚡️ Janri: {genre}\n📆 Yili: {rng.randint(1980, 2025)}\n\n🔢 KINO KODI: {1000 + i}"
+        rows.append((f"file_{i}", description, str(1000 + i), title, genre))
+    conn.executemany(
+        "INSERT INTO movies (file_id, description, code, title, genre) VALUES (?, ?, ?, ?, ?)", rows
+    )
+    conn.executemany(
+        "INSERT INTO users (user_id, full_name, username, phone_number) VALUES (?, ?, ?, ?)",
+        [(100000 + i, f"User {i}", f"user{i}", "+998900000000") for i in range(users)],
+    )
+    conn.commit()
+    ids = [row[0] for row in conn.execute("SELECT id FROM movies ORDER BY id DESC")]
+    conn.close()
+    return ids
+
+
+def _user(user_id):
+    return {"id": user_id, "is_bot": False, "first_name": "Bench", "username": f"u{user_id}"}
+
+
+def _message(update_id, user_id, **fields):
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": _user(user_id),
+            **fields,
+        },
+    }
+
+
+def _callback(update_id, user_id, data):
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": _user(user_id),
+            "chat_instance": "bench",
+            "data": data,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "text": "...",
+            },
+        },
+    }
+
+
+def make_updates(count, movie_ids, movies, users, admin_id, rng, mix):
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    updates = []
+    for update_id in range(1, count + 1):
+        kind = rng.choices(kinds, weights)[0]
+        user_id = 100000 + rng.randrange(max(users, 1))
+        if kind == "code_found":
+            raw = _message(update_id, user_id, text=str(1000 + rng.randrange(movies)))
+        elif kind == "code_missing":
+            raw = _message(update_id, user_id, text=str(rng.randint(10 ** 7, 10 ** 8)))
+        elif kind == "random":
+            raw = _message(update_id, user_id, text="/random", entities=[{"type": "bot_command", "offset": 0, "length": 7}])
+        elif kind == "refresh_random":
+            raw = _callback(update_id, user_id, "refresh_random")
+        elif kind == "next_page":
+            index = rng.randrange(max(len(movie_ids) // 10 - 1, 1)) * 10
+            page = index // 10 + 2
+            raw = _callback(update_id, admin_id, f"next_page_{page}_{movie_ids[min(index + 9, len(movie_ids) - 1)]}")
+        elif kind == "contact":
+            raw = _message(update_id, user_id, contact={"phone_number": "+998901234567", "first_name": "Bench", "user_id": user_id})
+        else:
+            raw = _message(update_id, user_id, text="/start", entities=[{"type": "bot_command", "offset": 0, "length": 6}])
+        updates.append((kind, raw))
+    return updates
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+async def run(args):
+    import main
+    from database import init_db
+    from repository import warm_movie_cache, load_catalog, close_pool
+
+    from metrics import ApiMetricsMiddleware
+
+    session = FakeSession()
+    session.middleware(ApiMetricsMiddleware())
+    main.bot.session = session
+    bot = main.bot
+
+    rng = random.Random(args.seed)
+    init_db()
+    movie_ids = seed_database(os.environ["DB_PATH"], args.movies, args.users, rng)
+    await warm_movie_cache()
+    await load_catalog()
+
+    mix = {
+        "code_found": 50, "code_missing": 15, "random": 10, "refresh_random": 10,
+        "next_page": 5, "contact": 5, "start": 5,
+    }
+    raw_updates = make_updates(args.updates, movie_ids, args.movies, args.users, main.ADMIN_ID, rng, mix)
+    updates = [(kind, Update.model_validate(raw, context={"bot": bot})) for kind, raw in raw_updates]
+
+    latencies = defaultdict(list)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def feed(kind, update):
+        async with semaphore:
+            start = time.perf_counter()
+            await main.dp.feed_update(bot, update)
+            latencies[kind].append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(feed(kind, update) for kind, update in updates))
+    elapsed = time.perf_counter() - started
+
+    close_pool()
+
+    result = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "params": vars(args),
+        "updates_per_sec": round(len(updates) / elapsed, 1),
+        "elapsed_sec": round(elapsed, 3),
+        "api_calls": dict(session.calls),
+        "handlers": {
+            kind: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p95_ms": round(percentile(values, 95) * 1000, 3),
+                "p99_ms": round(percentile(values, 99) * 1000, 3),
+                "mean_ms": round(statistics.mean(values) * 1000, 3),
+            }
+            for kind, values in sorted(latencies.items())
+        },
+    }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--movies", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--updates", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None,
+                        help="JSON natija fayli (standart: benchmarks/results/dispatcher-<vaqt>.json)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DB_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        os.environ.setdefault("BROADCAST_WORKER_ENABLED", "0")
+        # Yuborish tezligi cheklovi dispatcher'ning o'z narxini yashirmasligi uchun
+        os.environ.setdefault("VIDEO_SEND_RATE", "1000000")
+        # Throttling tashlab yuborgan update'lar handler vaqtiga qo'shilib natijani buzmasligi uchun
+        os.environ.setdefault("THROTTLE_RATE", "0")
+        result = asyncio.run(run(args))
+
+    print(f"⚡ {result['updates_per_sec']} update/s ({args.updates} ta, {result['elapsed_sec']} s)")
+    print(f"{'handler':16} {'soni':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for kind, stats in result["handlers"].items():
+        print(f"{kind:16} {stats['count']:7} {stats['p50_ms']:9.3f} {stats['p95_ms']:9.3f} {stats['p99_ms']:9.3f}")
+
+    output = args.output or os.path.join(
+        ROOT, "benchmarks", "results", f"dispatcher-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"💾 {output}")
+
+
+if __name__ == "__main__":
+    main()
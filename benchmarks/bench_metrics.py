@@ -0,0 +1,72 @@
+"""Metrika middleware'lari qo'shadigan qo'shimcha vaqtni o'lchash.
+
+    python benchmarks/bench_metrics.py --calls 200000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from metrics import HandlerMetricsMiddleware, ApiMetricsMiddleware, count_outcome, metrics  # noqa: E402
+
+
+class FakeHandlerObject:
+    def __init__(self, callback):
+        self.callback = callback
+
+
+async def send_movie_by_code(event, data):
+    return None
+
+
+async def make_request(bot, method):
+    return None
+
+
+class SendVideo:
+    pass
+
+
+async def measure(calls, fn):
+    start = time.perf_counter()
+    for _ in range(calls):
+        await fn()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+async def run(calls):
+    handler_mw = HandlerMetricsMiddleware()
+    api_mw = ApiMetricsMiddleware()
+    data = {"handler": FakeHandlerObject(send_movie_by_code)}
+    method = SendVideo()
+
+    baseline = await measure(calls, lambda: send_movie_by_code(None, data))
+    with_handler = await measure(calls, lambda: handler_mw(send_movie_by_code, None, data))
+    api_baseline = await measure(calls, lambda: make_request(None, method))
+    with_api = await measure(calls, lambda: api_mw(make_request, None, method))
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        count_outcome("send_movie_by_code", "found")
+    outcome = (time.perf_counter() - start) / calls * 1e9
+
+    print(f"handler middleware: +{with_handler - baseline:7.0f} ns/update")
+    print(f"api middleware:     +{with_api - api_baseline:7.0f} ns/so'rov")
+    print(f"count_outcome:       {outcome:7.0f} ns/chaqiruv")
+    print(f"jami bitta kod so'rovi uchun ≈ {(with_handler - baseline) + (with_api - api_baseline) + outcome:.0f} ns")
+    print(f"/metrics hajmi: {len(metrics.render())} bayt")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""FTS5 qidiruv indeksini LIKE skanerlash bilan solishtirish.
+
+    python benchmarks/bench_search.py --movies 100000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SYLLABLES = ["qa", "so", "kor", "yul", "duz", "tun", "sir", "li", "o", "rol", "ba", "hor",
+             "sha", "har", "jang", "sev", "gi", "dok", "tor", "kos", "mos", "den", "giz", "ol", "tin"]
+GENRES = ["Drama", "Komediya", "Boevik", "Fantastika", "Triller", "Multfilm"]
+
+
+def make_vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--movies", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng, 20000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DB_PATH"] = os.path.join(tmp, "bench.db")
+
+        import database
+
+        database.init_db()
+        conn = sqlite3.connect(os.environ["DB_PATH"])
+        rows = []
+        for i in range(args.movies):
+            title = " ".join(rng.choice(vocabulary) for _ in range(3)).title()
+            genre = rng.choice(GENRES)
+            description = f"{title}\n⚡️ Janri: {genre}\n📆 Yili: {rng.randint(1980, 2025)}"
+            rows.append(("file", description, str(100000 + i), title, genre))
+        conn.executemany(
+            "INSERT INTO movies (file_id, description, code, title, genre) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.commit()
+
+        queries = [rng.choice(vocabulary) for _ in range(3)]
+        queries.append(" ".join(rows[rng.randrange(len(rows))][3].lower().split()[:2]))
+        queries.append(rng.choice(vocabulary)[:4])
+        for query in queries:
+            words = query.split()
+            like_sql = (
+                "SELECT code, title FROM movies WHERE "
+                + " AND ".join("title LIKE ?" for _ in words)
+                + " ORDER BY id DESC LIMIT 10"
+            )
+            like_args = [f"%{w}%" for w in words]
+
+            fts_median, fts_max = timed(lambda: database.search_movies(query, 10, conn=conn), args.repeats)
+            like_median, like_max = timed(lambda: conn.execute(like_sql, like_args).fetchall(), args.repeats)
+            print(
+                f"{query!r:20} FTS5: {fts_median:7.2f} ms (max {fts_max:6.2f})   "
+                f"LIKE: {like_median:7.2f} ms (max {like_max:6.2f})"
+            )
+
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Standart SQLite sozlamalari va init_db profili (WAL va boshqalar) ostida
+yozish paytidagi parallel o'qishlarni solishtirish.
+
+Bitta oqim admin yuklashini takrorlaydi (kod ajratish + add_movie), qolgan
+oqimlar kod bo'yicha qidiruv va sahifalashni bajaradi.
+
+    python benchmarks/bench_sqlite_profile.py --movies 50000 --readers 4 --seconds 5
+"""
+import argparse
+import logging
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def seed(database, path, movies, rng):
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO movies (file_id, description, code, title, genre) VALUES (?, ?, ?, ?, ?)",
+        [(f"file_{i}", f"🎬 Film {i}\n" + "tavsif " * 60, str(100000 + i), f"Film {i}", rng.choice("ABCDEF"))
+         for i in range(movies)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_profile(database, path, tuned, readers, seconds, movies):
+    def connect():
+        conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        if tuned:
+            database.apply_pragmas(conn)
+        return conn
+
+    stop = threading.Event()
+    latencies = [[] for _ in range(readers)]
+    writes = [0]
+
+    def reader(index):
+        conn = connect()
+        rng = random.Random(index)
+        while not stop.is_set():
+            start = time.perf_counter()
+            if rng.random() < 0.8:
+                database.get_movie_by_code(str(100000 + rng.randrange(movies)), conn=conn)
+            else:
+                database.get_movies_page(10, before_id=rng.randrange(11, movies), conn=conn)
+            latencies[index].append(time.perf_counter() - start)
+        conn.close()
+
+    def writer():
+        conn = connect()
+        while not stop.is_set():
+            code = database.allocate_movie_code(conn=conn)
+            if code and database.add_movie(f"new_{code}", f"🎬 Yangi film {code}\n" + "tavsif " * 60, code, conn=conn):
+                writes[0] += 1
+        conn.close()
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    samples = sorted(value for values in latencies for value in values)
+    return {
+        "reads_per_sec": len(samples) / seconds,
+        "writes_per_sec": writes[0] / seconds,
+        "p50_ms": statistics.median(samples) * 1000,
+        "p99_ms": samples[int(len(samples) * 0.99)] * 1000,
+        "max_ms": samples[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--movies", type=int, default=50000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--dir", default=None, help="Baza fayllari uchun katalog (standart: vaqtinchalik)")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(dir=args.dir)
+    try:
+        os.environ["DB_PATH"] = os.path.join(tmp, "tuned.db")
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        logging.basicConfig(level=logging.CRITICAL)
+        import database
+
+        database.init_db()
+        seed(database, os.environ["DB_PATH"], args.movies, random.Random(1))
+
+        baseline = os.path.join(tmp, "baseline.db")
+        conn = sqlite3.connect(os.environ["DB_PATH"])
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+        shutil.copy(os.environ["DB_PATH"], baseline)
+        conn = sqlite3.connect(baseline)
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.close()
+
+        results = {
+            "default (DELETE, synchronous=FULL)": run_profile(database, baseline, False, args.readers, args.seconds, args.movies),
+            "init_db profile (WAL, NORMAL, mmap)": run_profile(database, os.environ["DB_PATH"], True, args.readers, args.seconds, args.movies),
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"{args.movies} film, {args.readers} o'quvchi + 1 yozuvchi, {args.seconds} s\n")
+    print(f"{'profil':38} {'o‘qish/s':>10} {'yozish/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, r in results.items():
+        print(f"{name:38} {r['reads_per_sec']:10.0f} {r['writes_per_sec']:9.1f} "
+              f"{r['p50_ms']:8.3f} {r['p99_ms']:8.3f} {r['max_ms']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
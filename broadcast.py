@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+
+import repository
+
+logger = logging.getLogger(__name__)
+
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+BLOCKED = "blocked"
+
+
+class TokenBucket:
+    """Asinxron token-bucket tezlik cheklagichi"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Telegram RetryAfter qaytarganda barcha yuborishlarni to'xtatib turish"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BroadcastStats:
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.blocked = 0
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.failed + self.blocked
+
+
+class Broadcaster:
+    """Xabarni ko'p foydalanuvchiga parallel va tezlik cheklovi bilan yuborish.
+
+    user_id lar bo'laklab oqim sifatida olinadi, cheklangan sondagi ishchilar
+    umumiy TokenBucket orqali yuboradi, RetryAfter kelganda hammasi kutadi.
+    """
+
+    def __init__(self, bot, rate: float = 25, workers: int = 20,
+                 progress_interval: float = 5.0, max_retries: int = 3):
+        self.bot = bot
+        self.bucket = TokenBucket(rate)
+        self.workers = workers
+        self.progress_interval = progress_interval
+        self.max_retries = max_retries
+
+    async def run(self, chunks: AsyncIterator[List[int]], text: str,
+                  on_progress: Optional[Callable[[BroadcastStats], Awaitable[None]]] = None,
+                  on_result: Optional[Callable[[int, str], Awaitable[None]]] = None) -> BroadcastStats:
+        stats = BroadcastStats()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+
+        async def producer():
+            async for user_ids in chunks:
+                for user_id in user_ids:
+                    await queue.put(user_id)
+            for _ in range(self.workers):
+                await queue.put(None)
+
+        async def worker():
+            while True:
+                user_id = await queue.get()
+                if user_id is None:
+                    return
+                status = await self._send(user_id, text)
+                setattr(stats, status, getattr(stats, status) + 1)
+                if on_result is not None:
+                    await on_result(user_id, status)
+
+        async def reporter():
+            while True:
+                await asyncio.sleep(self.progress_interval)
+                await on_progress(stats)
+
+        progress_task = asyncio.create_task(reporter()) if on_progress else None
+        try:
+            await asyncio.gather(producer(), *(worker() for _ in range(self.workers)))
+        finally:
+            if progress_task is not None:
+                progress_task.cancel()
+
+        return stats
+
+    async def _send(self, user_id: int, text: str) -> str:
+        for _ in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                await self.bot.send_message(chat_id=user_id, text=text, parse_mode="HTML")
+                return SENT
+            except TelegramRetryAfter as e:
+                logger.warning("Telegram cheklovi: %ss kutilmoqda", e.retry_after)
+                self.bucket.pause(e.retry_after)
+            except TelegramForbiddenError:
+                return BLOCKED
+            except Exception as e:
+                logger.error("Reklama %s ga yuborilmadi: %s", user_id, e)
+                return FAILED
+        return FAILED
+
+
+class BroadcastWorker:
+    """Bazadagi reklama vazifalarini fonda bajaruvchi ishchi.
+
+    Har bir qabul qiluvchining holati saqlanadi, shuning uchun qayta
+    ishga tushirilganda faqat yuborilmaganlarga davom ettiriladi.
+    Vazifa bazada ijara (lease) bilan egallanadi: bir nechta jarayonda
+    ishchi yoqilgan bo'lsa ham har bir vazifani faqat bittasi yuboradi.
+    """
+
+    def __init__(self, bot, rate: float = 25, workers: int = 20,
+                 chunk_size: int = 500, flush_size: int = 50, poll_interval: float = 30,
+                 flush_retries: int = 3, progress_interval: float = 5.0, lease_seconds: float = 60):
+        self.bot = bot
+        self.rate = rate
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.flush_size = flush_size
+        self.poll_interval = poll_interval
+        self.flush_retries = flush_retries
+        self.progress_interval = progress_interval
+        self.lease_seconds = lease_seconds
+        self.owner = uuid.uuid4().hex
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    def notify(self):
+        """Yangi vazifa qo'shilganini bildirish"""
+        self._wakeup.set()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            self._wakeup.clear()
+            for job in await repository.get_unfinished_broadcast_jobs():
+                try:
+                    await self._process(*job)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error("Reklama vazifasi %s bajarilmadi: %s", job[0], e)
+            # Boshqa ishchida yaratilgan vazifalar ham vaqti-vaqti bilan tekshiriladi
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _process(self, job_id: int, text: str, chat_id: Optional[int], message_id: Optional[int]):
+        if not await repository.claim_broadcast_job(job_id, self.owner, self.lease_seconds):
+            # Vazifani boshqa ishchi bajarmoqda
+            return
+
+        broadcaster = Broadcaster(self.bot, rate=self.rate, workers=self.workers,
+                                  progress_interval=self.progress_interval)
+        pending: List[Tuple[int, str]] = []
+
+        async def on_result(user_id: int, status: str):
+            pending.append((user_id, status))
+            if len(pending) >= self.flush_size:
+                await flush()
+
+        async def flush() -> bool:
+            batch = pending[:]
+            pending.clear()
+            if batch and not await repository.mark_recipients(job_id, batch):
+                # Yozilmagan natijalar keyingi flush'da qayta saqlanadi
+                pending[:0] = batch
+                return False
+            return True
+
+        async def report_progress(stats: BroadcastStats):
+            await flush()
+            await self._edit_status(
+                chat_id, message_id,
+                f"📤 Reklama yuborilmoqda...\n\n"
+                f"✅ Yuborildi: {stats.sent}\n"
+                f"❌ Xatolik: {stats.failed + stats.blocked}"
+            )
+
+        sending = asyncio.create_task(broadcaster.run(
+            repository.iter_pending_recipients(job_id, self.chunk_size),
+            f"📢 <b>E'lon:</b>\n\n{text}",
+            on_progress=report_progress,
+            on_result=on_result
+        ))
+        lease = asyncio.create_task(self._keep_lease(job_id))
+        try:
+            await asyncio.wait({sending, lease}, return_when=asyncio.FIRST_COMPLETED)
+            lost = not sending.done()
+            if not lost:
+                sending.result()
+                for attempt in range(self.flush_retries):
+                    if await flush():
+                        break
+                    await asyncio.sleep(2 ** attempt)
+        finally:
+            sending.cancel()
+            lease.cancel()
+            await asyncio.gather(sending, lease, return_exceptions=True)
+            await flush()
+
+        if lost:
+            # Ijara yangilanmadi va boshqa ishchiga o'tgan bo'lishi mumkin: ikki marta yubormaslik uchun to'xtaymiz
+            logger.warning("Reklama vazifasi %s ijarasi yo'qoldi, yuborish to'xtatildi", job_id)
+            return
+
+        counts = await repository.finish_broadcast_job(job_id)
+        if not counts or counts.get(PENDING):
+            # Natijasi saqlanmagan qabul qiluvchilar bor: vazifa keyingi tekshiruvda davom etadi
+            logger.warning("Reklama vazifasi %s tugallanmadi, pending: %s", job_id, counts.get(PENDING))
+            await repository.release_broadcast_job(job_id, self.owner)
+            return
+        sent = counts.get(SENT, 0)
+        failed = counts.get(FAILED, 0) + counts.get(BLOCKED, 0)
+        await self._edit_status(
+            chat_id, message_id,
+            f"✅ Reklama yuborish tugadi!\n\n"
+            f"✅ Muvaffaqiyatli: {sent}\n"
+            f"❌ Xatolik: {failed}\n"
+            f"👥 Jami: {sent + failed}"
+        )
+
+    async def _keep_lease(self, job_id: int):
+        """Yuborish davomida ijarani uzaytirib turish, uzaytirib bo'lmasa qaytadi"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await repository.claim_broadcast_job(job_id, self.owner, self.lease_seconds):
+                return
+
+    async def _edit_status(self, chat_id: Optional[int], message_id: Optional[int], text: str):
+        if chat_id is None or message_id is None:
+            return
+        try:
+            await self.bot.edit_message_text(text=text, chat_id=chat_id, message_id=message_id)
+        except Exception as e:
+            logger.warning("Reklama holatini yangilab bo'lmadi: %s", e)
@@ -9,3 +9,20 @@ phone_btn = ReplyKeyboardMarkup(
     ], resize_keyboard=True
 )
 
+
+stats_btn = ReplyKeyboardMarkup(
+    keyboard=[
+        [
+            KeyboardButton(text="🎲 Tasodifiy filmlar"),
+            KeyboardButton(text="🎯 Menga tavsiya")
+        ],
+        [
+            KeyboardButton(text="🌟 Bugungi top"),
+            KeyboardButton(text="📊 Haftalik top")
+        ],
+        [
+            KeyboardButton(text="🎭 Janrlar bo'yicha"),
+            KeyboardButton(text="🔙 Asosiy menyu")
+        ]
+    ], resize_keyboard=True
+)
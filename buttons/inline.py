@@ -0,0 +1,14 @@
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+
+def sub_keyboard(channel_username):
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(text="📢 Kanalga obuna bo'lish", url=f"https://t.me/{channel_username.lstrip('@')}")
+            ],
+            [
+                InlineKeyboardButton(text="✅ Tekshirish", callback_data="check_sub")
+            ]
+        ]
+    )
@@ -0,0 +1,58 @@
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class MovieCatalog:
+    """Statistika uchun filmlar katalogining xotiradagi nusxasi.
+
+    Faqat (code, title, genre) saqlanadi; bir marta yuklanadi va
+    add_movie orqali qo'shimcha ravishda yangilanadi.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.loaded = False
+        self._movies: List[Tuple[str, str, str]] = []
+        self._codes: Dict[str, int] = {}
+
+    def load(self, movies: Iterable[Tuple[str, str, str]]):
+        """(code, title, genre) qatorlaridan katalogni qayta qurish"""
+        previous = self._movies
+        self._movies = []
+        self._codes = {}
+        for code, title, genre in movies:
+            self._append(str(code), title, genre)
+        # Yuklash paytida add() orqali qo'shilganlar saqlab qolinadi
+        for code, title, genre in previous:
+            if code not in self._codes:
+                self._append(code, title, genre)
+        self.loaded = True
+        self.version += 1
+
+    def add(self, code: str, title: str, genre: str):
+        """Yangi filmni katalogga qo'shish"""
+        if str(code) in self._codes:
+            return
+        self._append(str(code), title, genre)
+        self.version += 1
+
+    def _append(self, code: str, title: str, genre: str):
+        self._codes[code] = len(self._movies)
+        self._movies.append((code, title, genre))
+
+    def get(self, code: str) -> Optional[Tuple[str, str, str]]:
+        index = self._codes.get(str(code))
+        return self._movies[index] if index is not None else None
+
+    def sample(self, count: int, rng=random) -> List[Tuple[str, str, str]]:
+        """O(k) tasodifiy tanlov"""
+        return rng.sample(self._movies, min(count, len(self._movies)))
+
+    def choice(self, rng=random):
+        return rng.choice(self._movies) if self._movies else None
+
+    def __len__(self):
+        return len(self._movies)
+
+
+catalog = MovieCatalog()
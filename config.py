@@ -6,4 +6,62 @@ load_dotenv()
 
 TOKEN = os.getenv('TOKEN')
 ADMIN_ID = int(os.getenv('ADMIN_ID'))
-CHANNEL_USERNAME = os.getenv('CHANNEL_USERNAME')
\ No newline at end of file
+CHANNEL_USERNAME = os.getenv('CHANNEL_USERNAME')
+
+DB_PATH = os.getenv('DB_PATH', 'movie_bot.db')
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '4'))
+MOVIE_CACHE_SIZE = int(os.getenv('MOVIE_CACHE_SIZE', '5000'))
+MOVIE_CACHE_TTL = int(os.getenv('MOVIE_CACHE_TTL', '3600'))
+
+DEBUG_DIAGNOSTICS = os.getenv('DEBUG_DIAGNOSTICS', '0') == '1'
+
+SUB_CACHE_POSITIVE_TTL = int(os.getenv('SUB_CACHE_POSITIVE_TTL', '600'))
+SUB_CACHE_NEGATIVE_TTL = int(os.getenv('SUB_CACHE_NEGATIVE_TTL', '30'))
+# 0 - hajm cheklanmaydi
+SUB_CACHE_SIZE = int(os.getenv('SUB_CACHE_SIZE', '100000'))
+
+BROADCAST_RATE = float(os.getenv('BROADCAST_RATE', '25'))
+BROADCAST_WORKERS = int(os.getenv('BROADCAST_WORKERS', '20'))
+BROADCAST_CHUNK_SIZE = int(os.getenv('BROADCAST_CHUNK_SIZE', '500'))
+BROADCAST_WORKER_ENABLED = os.getenv('BROADCAST_WORKER_ENABLED', '1') == '1'
+
+BOT_MODE = os.getenv('BOT_MODE', 'polling')
+WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/webhook')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')
+WEBAPP_HOST = os.getenv('WEBAPP_HOST', '0.0.0.0')
+WEBAPP_PORT = int(os.getenv('WEBAPP_PORT', '8080'))
+WEBHOOK_MAX_CONCURRENCY = int(os.getenv('WEBHOOK_MAX_CONCURRENCY', '50'))
+
+REDIS_URL = os.getenv('REDIS_URL', '')
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_LEVELS = os.getenv('LOG_LEVELS', 'aiogram.event=WARNING')
+
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+
+THROTTLE_RATE = float(os.getenv('THROTTLE_RATE', '1'))
+THROTTLE_BURST = float(os.getenv('THROTTLE_BURST', '5'))
+THROTTLE_CALLBACK_WINDOW = float(os.getenv('THROTTLE_CALLBACK_WINDOW', '1.0'))
+
+VIDEO_SEND_RATE = float(os.getenv('VIDEO_SEND_RATE', '25'))
+VIDEO_SEND_CONCURRENCY = int(os.getenv('VIDEO_SEND_CONCURRENCY', '20'))
+FILE_CHECK_INTERVAL = int(os.getenv('FILE_CHECK_INTERVAL', '86400'))
+FILE_CHECK_RATE = float(os.getenv('FILE_CHECK_RATE', '1'))
+
+VIEW_FLUSH_INTERVAL = float(os.getenv('VIEW_FLUSH_INTERVAL', '5'))
+VIEW_FLUSH_SIZE = int(os.getenv('VIEW_FLUSH_SIZE', '500'))
+VIEW_RETENTION_DAYS = int(os.getenv('VIEW_RETENTION_DAYS', '30'))
+
+USER_FLUSH_DELAY = float(os.getenv('USER_FLUSH_DELAY', '0.005'))
+USER_FLUSH_SIZE = int(os.getenv('USER_FLUSH_SIZE', '200'))
+
+DB_JOURNAL_MODE = os.getenv('DB_JOURNAL_MODE', 'WAL')
+DB_SYNCHRONOUS = os.getenv('DB_SYNCHRONOUS', 'NORMAL')
+DB_MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', str(256 * 1024 * 1024)))
+DB_CACHE_SIZE = int(os.getenv('DB_CACHE_SIZE', '-32000'))
+DB_BUSY_TIMEOUT = int(os.getenv('DB_BUSY_TIMEOUT', '30000'))
+
+LEGACY_DB_PATH = os.getenv('LEGACY_DB_PATH', 'filmbot.db')
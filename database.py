@@ -1,197 +1,626 @@
+import logging
 import sqlite3
 import os
+import re
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Optional, List, Tuple
 
-def init_db():
-    """Bazani ishga tushirish"""
-    print("📂 Database ishga tushirilmoqda...")
-    
-    db_path = 'movie_bot.db'
-    print(f"📍 Database yo'li: {os.path.abspath(db_path)}")
+from config import DB_PATH, DEBUG_DIAGNOSTICS, DB_JOURNAL_MODE, DB_SYNCHRONOUS, DB_MMAP_SIZE, DB_CACHE_SIZE, DB_BUSY_TIMEOUT
+from movie_meta import parse_movie_meta
+from movie_code import CODE_START_LENGTH, tier_size, code_for_index
+from migrations import migrate
+
+logger = logging.getLogger(__name__)
+
+
+# Ko'rishlar hisoblagichlari: tur -> (jadval, davr ustuni)
+_VIEW_TABLES = {
+    'daily': ('movie_views_daily', 'day'),
+    'weekly': ('movie_views_weekly', 'week'),
+}
+
+
+def apply_pragmas(conn: sqlite3.Connection):
+    """Har bir ulanish uchun tezlik sozlamalari (journal_mode bazada saqlanadi)"""
+    conn.execute(f'PRAGMA synchronous = {DB_SYNCHRONOUS}')
+    conn.execute(f'PRAGMA mmap_size = {DB_MMAP_SIZE}')
+    conn.execute(f'PRAGMA cache_size = {DB_CACHE_SIZE}')
+    conn.execute(f'PRAGMA busy_timeout = {DB_BUSY_TIMEOUT}')
+    conn.execute('PRAGMA temp_store = MEMORY')
+
+def optimize(conn: sqlite3.Connection):
+    """Ulanishni yopishdan oldin so'rov rejalashtiruvchi statistikasini yangilash"""
+    try:
+        conn.execute('PRAGMA optimize')
+    except sqlite3.Error as e:
+        logger.warning("PRAGMA optimize bajarilmadi: %s", e)
+
+@contextmanager
+def _connection(conn: Optional[sqlite3.Connection] = None):
+    """Tashqi ulanishni qaytaradi yoki vaqtinchalik ulanish ochadi"""
+    if conn is not None:
+        yield conn
+        return
     
+    conn = sqlite3.connect(DB_PATH)
+    apply_pragmas(conn)
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY,
-                full_name TEXT,
-                username TEXT,
-                phone_number TEXT,
-                registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS movies (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                file_id TEXT NOT NULL,
-                description TEXT NOT NULL,
-                code TEXT UNIQUE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
-        print(f"📊 Mavjud jadvallar: {tables}")
-        
-        if ('movies',) in tables:
-            cursor.execute("PRAGMA table_info(movies);")
-            columns = cursor.fetchall()
-            print(f"📋 Movies jadvali ustunlari: {columns}")
-        
-        conn.commit()
+        yield conn
+    finally:
         conn.close()
-        print("✅ Database muvaffaqiyatli ishga tushirildi")
+
+def init_db() -> int:
+    """Bazani ishga tushirish va migratsiyalarni qo'llash, sxema versiyasini qaytaradi"""
+    logger.info("📍 Database yo'li: %s", os.path.abspath(DB_PATH))
+    
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            journal_mode = conn.execute(f'PRAGMA journal_mode = {DB_JOURNAL_MODE}').fetchone()[0]
+            apply_pragmas(conn)
+            version = migrate(conn)
+        finally:
+            conn.close()
+        logger.info("✅ Database tayyor (sxema v%s, journal_mode: %s)", version, journal_mode)
+        return version
         
     except Exception as e:
-        print(f"❌ Database ishga tushirishda xato: {e}")
+        logger.error("❌ Database ishga tushirishda xato: %s", e)
         raise
 
-def add_user(user_id: int, full_name: str, username: str, phone_number: str) -> bool:
-    """Foydalanuvchi qo'shish"""
+def add_users(users: List[Tuple[int, str, str, str]], conn: Optional[sqlite3.Connection] = None) -> bool:
+    """Foydalanuvchilarni bitta tranzaksiyada qo'shish yoki yangilash"""
     try:
-        conn = sqlite3.connect('movie_bot.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO users (user_id, full_name, username, phone_number)
-            VALUES (?, ?, ?, ?)
-        ''', (user_id, full_name, username, phone_number))
-        
-        conn.commit()
-        conn.close()
-        print(f"✅ Foydalanuvchi qo'shildi: {user_id}")
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.executemany('''
+                INSERT INTO users (user_id, full_name, username, phone_number)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (user_id) DO UPDATE SET 
+                    full_name = excluded.full_name, 
+                    username = excluded.username, 
+                    phone_number = excluded.phone_number, 
+                    is_active = 1
+            ''', users)
+            
+            conn.commit()
+        logger.debug("✅ %s ta foydalanuvchi saqlandi", len(users))
         return True
     except Exception as e:
-        print(f"❌ Foydalanuvchi qo'shishda xato: {e}")
+        logger.error("❌ Foydalanuvchilarni saqlashda xato: %s", e)
         return False
 
-def get_user(user_id: int) -> Optional[Tuple]:
+def get_all_user_ids(conn: Optional[sqlite3.Connection] = None) -> List[int]:
+    """Ro'yxatdan o'tgan barcha foydalanuvchilar ID lari"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT user_id FROM users')
+            return [row[0] for row in cursor.fetchall()]
+    except Exception as e:
+        logger.error("❌ Foydalanuvchi ID larini olishda xato: %s", e)
+        return []
+
+def get_user(user_id: int, conn: Optional[sqlite3.Connection] = None) -> Optional[Tuple]:
     """Foydalanuvchini olish"""
     try:
-        conn = sqlite3.connect('movie_bot.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
-        user = cursor.fetchone()
-        
-        conn.close()
-        return user
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
+            return cursor.fetchone()
     except Exception as e:
-        print(f"❌ Foydalanuvchi olishda xato: {e}")
+        logger.error("❌ Foydalanuvchi olishda xato: %s", e)
         return None
 
-def add_movie(file_id: str, description: str, code: str) -> bool:
-    """Film qo'shish"""
-    print(f"🎬 Film qo'shilmoqda: code={code}")
+def add_movie(file_id: str, description: str, code: str, meta: Optional[Tuple] = None,
+              parts: Optional[List[str]] = None, conn: Optional[sqlite3.Connection] = None) -> bool:
+    """Film qo'shish (meta = (title, genre, year), parts = ko'p qismli filmning barcha file_id lari)"""
+    title, genre, year = meta or parse_movie_meta(description)
+    logger.debug("🎬 Film qo'shilmoqda: code=%s", code)
     
     try:
-        conn = sqlite3.connect('movie_bot.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT COUNT(*) FROM movies WHERE code = ?', (str(code),))
-        count = cursor.fetchone()[0]
-        
-        if count > 0:
-            print(f"⚠️ {code} kodi allaqachon mavjud!")
-            conn.close()
-            return False
-        
-        cursor.execute('''
-            INSERT INTO movies (file_id, description, code) 
-            VALUES (?, ?, ?)
-        ''', (file_id, description, str(code)))
-        
-        conn.commit()
-        
-        cursor.execute('SELECT COUNT(*) FROM movies WHERE code = ?', (str(code),))
-        count = cursor.fetchone()[0]
-        print(f"✅ Film saqlandi. {code} kodli filmlar: {count}")
-        
-        conn.close()
-        return True
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT COUNT(*) FROM movies WHERE code = ?', (str(code),))
+            count = cursor.fetchone()[0]
+            
+            if count > 0:
+                logger.warning("⚠️ %s kodi allaqachon mavjud!", code)
+                return False
+            
+            cursor.execute('''
+                INSERT INTO movies (file_id, description, code, title, genre, year) 
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (file_id, description, str(code), title, genre, year))
+            
+            if parts and len(parts) > 1:
+                cursor.executemany(
+                    'INSERT INTO movie_parts (movie_id, part_no, file_id) VALUES (?, ?, ?)',
+                    [(cursor.lastrowid, part_no, part) for part_no, part in enumerate(parts, 1)]
+                )
+            
+            conn.commit()
+            logger.debug("✅ Film saqlandi: %s", code)
+            
+            return True
         
     except Exception as e:
-        print(f"❌ Film qo'shishda xato: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Film qo'shishda xato: %s", e)
         return False
 
-def get_movie_by_code(code: str) -> Optional[Tuple]:
+def allocate_movie_code(conn: Optional[sqlite3.Connection] = None) -> Optional[str]:
+    """Yangi noyob film kodini bitta tranzaksiyada ajratish"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            
+            cursor.execute('SELECT length, next_index FROM code_allocator WHERE id = 1')
+            row = cursor.fetchone()
+            length, index = row if row else (CODE_START_LENGTH, 0)
+            
+            while True:
+                if index >= tier_size(length):
+                    length += 1
+                    index = 0
+                code = code_for_index(length, index)
+                index += 1
+                
+                # Eski tasodifiy kodlar bilan to'qnashuvni o'tkazib yuborish
+                cursor.execute('SELECT 1 FROM movies WHERE code = ?', (code,))
+                if cursor.fetchone() is None:
+                    break
+            
+            cursor.execute('''
+                INSERT OR REPLACE INTO code_allocator (id, length, next_index) 
+                VALUES (1, ?, ?)
+            ''', (length, index))
+            conn.commit()
+            return code
+    except Exception as e:
+        logger.error("❌ Film kodini ajratishda xato: %s", e)
+        return None
+
+def get_movie_by_code(code: str, conn: Optional[sqlite3.Connection] = None) -> Optional[Tuple]:
     """Filmni kod orqali olish"""
     try:
-        print(f"🔍 Film qidirilmoqda: {code}")
-        
-        conn = sqlite3.connect('movie_bot.db')
-        cursor = conn.cursor()
+        logger.debug("🔍 Film qidirilmoqda: %s", code)
         
-        cursor.execute('SELECT file_id, description FROM movies WHERE code = ?', (str(code),))
-        movie = cursor.fetchone()
-        
-        if movie:
-            print(f"✅ Film topildi: {code}")
-        else:
-            print(f"❌ Film topilmadi: {code}")
-            cursor.execute('SELECT code FROM movies')
-            all_codes = cursor.fetchall()
-            print(f"📋 Mavjud kodlar: {all_codes}")
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT file_id, description FROM movies WHERE code = ?', (str(code),))
+            movie = cursor.fetchone()
+            
+            if movie:
+                logger.debug("✅ Film topildi: %s", code)
+            else:
+                logger.debug("❌ Film topilmadi: %s", code)
+                if DEBUG_DIAGNOSTICS:
+                    cursor.execute('SELECT code FROM movies')
+                    all_codes = cursor.fetchall()
+                    logger.debug("📋 Mavjud kodlar: %s", all_codes)
         
-        conn.close()
         return movie
     except Exception as e:
-        print(f"❌ Film olishda xato: {e}")
+        logger.error("❌ Film olishda xato: %s", e)
         return None
 
-def get_all_movies() -> List[Tuple]:
+def get_all_movies(conn: Optional[sqlite3.Connection] = None) -> List[Tuple]:
     """Barcha filmlarni olish"""
     try:
-        conn = sqlite3.connect('movie_bot.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT code, description FROM movies ORDER BY id DESC')
-        movies = cursor.fetchall()
-        
-        conn.close()
-        return movies
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT code, title FROM movies ORDER BY id DESC')
+            return cursor.fetchall()
     except Exception as e:
-        print(f"❌ Barcha filmlarni olishda xato: {e}")
+        logger.error("❌ Barcha filmlarni olishda xato: %s", e)
         return []
 
-def get_total_movies_count() -> int:
+def get_total_movies_count(conn: Optional[sqlite3.Connection] = None) -> int:
     """Jami film soni"""
     try:
-        conn = sqlite3.connect('movie_bot.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT COUNT(*) FROM movies')
-        count = cursor.fetchone()[0]
-        
-        conn.close()
-        return count
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("SELECT value FROM counters WHERE name = 'movies'")
+            row = cursor.fetchone()
+            return row[0] if row else 0
     except Exception as e:
-        print(f"❌ Film sonini olishda xato: {e}")
+        logger.error("❌ Film sonini olishda xato: %s", e)
         return 0
 
-def get_movies_by_page(page: int, limit: int) -> List[Tuple]:
-    """Sahifalab film olish"""
+def get_total_users_count(conn: Optional[sqlite3.Connection] = None) -> int:
+    """Jami foydalanuvchilar soni"""
     try:
-        offset = (page - 1) * limit
-        conn = sqlite3.connect('movie_bot.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT code, description FROM movies 
-            ORDER BY id DESC 
-            LIMIT ? OFFSET ?
-        ''', (limit, offset))
-        
-        movies = cursor.fetchall()
-        conn.close()
-        return movies
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT COUNT(*) FROM users')
+            return cursor.fetchone()[0]
+    except Exception as e:
+        logger.error("❌ Foydalanuvchilar sonini olishda xato: %s", e)
+        return 0
+
+def get_movies_page(limit: int, before_id: Optional[int] = None, after_id: Optional[int] = None,
+                    conn: Optional[sqlite3.Connection] = None) -> List[Tuple]:
+    """Keyset sahifalash: id bo'yicha kamayish tartibida (id, code, title) qatorlari.
+
+    before_id berilsa undan eskilari, after_id berilsa undan yangilari olinadi.
+    """
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            if after_id is not None:
+                cursor.execute('''
+                    SELECT id, code, title FROM movies 
+                    WHERE id > ? 
+                    ORDER BY id ASC 
+                    LIMIT ?
+                ''', (after_id, limit))
+                return cursor.fetchall()[::-1]
+            
+            cursor.execute('''
+                SELECT id, code, title FROM movies 
+                WHERE id < ? 
+                ORDER BY id DESC 
+                LIMIT ?
+            ''', (before_id if before_id is not None else 2 ** 63 - 1, limit))
+            return cursor.fetchall()
+    except Exception as e:
+        logger.error("❌ Sahifalab film olishda xato: %s", e)
+        return []
+
+def get_movies_for_cache(limit: int, conn: Optional[sqlite3.Connection] = None) -> List[Tuple]:
+    """Kesh uchun eng so'nggi filmlarni olish"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT code, file_id, description FROM movies 
+                ORDER BY id DESC 
+                LIMIT ?
+            ''', (limit,))
+            
+            return cursor.fetchall()
+    except Exception as e:
+        logger.error("❌ Kesh uchun filmlarni olishda xato: %s", e)
+        return []
+
+
+def get_all_codes(conn: Optional[sqlite3.Connection] = None) -> List[str]:
+    """Barcha film kodlarini olish"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT code FROM movies')
+            return [row[0] for row in cursor.fetchall()]
+    except Exception as e:
+        logger.error("❌ Film kodlarini olishda xato: %s", e)
+        return []
+
+def get_all_movie_parts(conn: Optional[sqlite3.Connection] = None) -> List[Tuple]:
+    """Ko'p qismli filmlarning qismlari: (code, file_id) tartib bo'yicha"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT m.code, p.file_id FROM movie_parts p 
+                JOIN movies m ON m.id = p.movie_id 
+                ORDER BY p.movie_id, p.part_no
+            ''')
+            return cursor.fetchall()
+    except Exception as e:
+        logger.error("❌ Film qismlarini olishda xato: %s", e)
+        return []
+
+def get_movie_parts(code: str, conn: Optional[sqlite3.Connection] = None) -> List[str]:
+    """Bitta filmning qismlari (bir qismli film uchun bo'sh ro'yxat)"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT p.file_id FROM movie_parts p 
+                JOIN movies m ON m.id = p.movie_id 
+                WHERE m.code = ? 
+                ORDER BY p.part_no
+            ''', (str(code),))
+            return [row[0] for row in cursor.fetchall()]
+    except Exception as e:
+        logger.error("❌ Film qismlarini olishda xato: %s", e)
+        return []
+
+def get_file_ids_chunk(after_id: int, limit: int, conn: Optional[sqlite3.Connection] = None) -> List[Tuple]:
+    """Tekshirish uchun (id, code, file_id) qatorlari, qismlar bilan birga"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT m.id, m.code, COALESCE(p.file_id, m.file_id) 
+                FROM (SELECT id, code, file_id FROM movies WHERE id > ? ORDER BY id LIMIT ?) m 
+                LEFT JOIN movie_parts p ON p.movie_id = m.id 
+                ORDER BY m.id, p.part_no
+            ''', (after_id, limit))
+            return cursor.fetchall()
     except Exception as e:
-        print(f"❌ Sahifalab film olishda xato: {e}")
-        return []
\ No newline at end of file
+        logger.error("❌ file_id larni olishda xato: %s", e)
+        return []
+
+def create_broadcast_job(text: str, chat_id: int, message_id: int, conn: Optional[sqlite3.Connection] = None) -> Optional[int]:
+    """Reklama vazifasini barcha faol foydalanuvchilar bilan yaratish"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO broadcast_jobs (text, chat_id, message_id)
+                VALUES (?, ?, ?)
+            ''', (text, chat_id, message_id))
+            job_id = cursor.lastrowid
+            
+            cursor.execute('''
+                INSERT INTO broadcast_recipients (job_id, user_id)
+                SELECT ?, user_id FROM users WHERE is_active = 1
+            ''', (job_id,))
+            
+            conn.commit()
+            return job_id
+    except Exception as e:
+        logger.error("❌ Reklama vazifasini yaratishda xato: %s", e)
+        return None
+
+def get_unfinished_broadcast_jobs(conn: Optional[sqlite3.Connection] = None) -> List[Tuple]:
+    """Tugallanmagan reklama vazifalarini olish"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, text, chat_id, message_id FROM broadcast_jobs 
+                WHERE status != 'done' 
+                ORDER BY id
+            ''')
+            return cursor.fetchall()
+    except Exception as e:
+        logger.error("❌ Reklama vazifalarini olishda xato: %s", e)
+        return []
+
+def claim_broadcast_job(job_id: int, owner: str, lease_until: float, now: float,
+                        conn: Optional[sqlite3.Connection] = None) -> bool:
+    """Vazifani egallash yoki ijarasini uzaytirish (boshqa ishchining amaldagi ijarasi bo'lsa False)"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                UPDATE broadcast_jobs SET owner = ?, lease_until = ? 
+                WHERE id = ? AND status != 'done' 
+                  AND (owner IS NULL OR owner = ? OR lease_until < ?)
+            ''', (owner, lease_until, job_id, owner, now))
+            conn.commit()
+            return cursor.rowcount == 1
+    except Exception as e:
+        logger.error("❌ Reklama vazifasini egallashda xato: %s", e)
+        return False
+
+def release_broadcast_job(job_id: int, owner: str, conn: Optional[sqlite3.Connection] = None) -> bool:
+    """Tugallanmagan vazifa ijarasini bo'shatish, boshqa ishchi darhol davom ettira oladi"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                UPDATE broadcast_jobs SET owner = NULL, lease_until = NULL 
+                WHERE id = ? AND owner = ?
+            ''', (job_id, owner))
+            conn.commit()
+            return cursor.rowcount == 1
+    except Exception as e:
+        logger.error("❌ Reklama vazifasi ijarasini bo'shatishda xato: %s", e)
+        return False
+
+def get_pending_recipients(job_id: int, last_user_id: int, limit: int, conn: Optional[sqlite3.Connection] = None) -> List[int]:
+    """Hali yuborilmagan qabul qiluvchilarning keyingi bo'lagi"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT user_id FROM broadcast_recipients 
+                WHERE job_id = ? AND status = 'pending' AND user_id > ? 
+                ORDER BY user_id 
+                LIMIT ?
+            ''', (job_id, last_user_id, limit))
+            
+            return [row[0] for row in cursor.fetchall()]
+    except Exception as e:
+        logger.error("❌ Qabul qiluvchilarni olishda xato: %s", e)
+        return []
+
+def mark_recipients(job_id: int, results: List[Tuple[int, str]], conn: Optional[sqlite3.Connection] = None) -> bool:
+    """Yuborish natijalarini saqlash, bloklaganlarni nofaol qilish"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.executemany('''
+                UPDATE broadcast_recipients SET status = ? 
+                WHERE job_id = ? AND user_id = ?
+            ''', [(status, job_id, user_id) for user_id, status in results])
+            
+            cursor.executemany(
+                'UPDATE users SET is_active = 0 WHERE user_id = ?',
+                [(user_id,) for user_id, status in results if status == 'blocked']
+            )
+            
+            conn.commit()
+            return True
+    except Exception as e:
+        logger.error("❌ Yuborish natijalarini saqlashda xato: %s", e)
+        return False
+
+def finish_broadcast_job(job_id: int, conn: Optional[sqlite3.Connection] = None) -> dict:
+    """Vazifani yakunlash va holatlar bo'yicha sonini qaytarish.
+
+    'pending' qatorlar qolgan bo'lsa vazifa ochiq qoladi va keyinroq davom ettiriladi.
+    """
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                UPDATE broadcast_jobs SET status = 'done', finished_at = CURRENT_TIMESTAMP 
+                WHERE id = ? AND NOT EXISTS (
+                    SELECT 1 FROM broadcast_recipients WHERE job_id = ? AND status = 'pending'
+                )
+            ''', (job_id, job_id))
+            conn.commit()
+            
+            cursor.execute('''
+                SELECT status, COUNT(*) FROM broadcast_recipients 
+                WHERE job_id = ? 
+                GROUP BY status
+            ''', (job_id,))
+            return dict(cursor.fetchall())
+    except Exception as e:
+        logger.error("❌ Reklama vazifasini yakunlashda xato: %s", e)
+        return {}
+
+
+def get_catalog_movies(conn: Optional[sqlite3.Connection] = None) -> List[Tuple]:
+    """Statistika katalogi uchun (code, title, genre) qatorlari"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT code, title, genre FROM movies ORDER BY id')
+            return cursor.fetchall()
+    except Exception as e:
+        logger.error("❌ Katalogni olishda xato: %s", e)
+        return []
+
+def get_top_movies_by_genre(per_genre: int, conn: Optional[sqlite3.Connection] = None) -> List[Tuple]:
+    """Har bir janrdan eng so'nggi filmlar (bitta guruhlangan so'rov)"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT code, title, genre FROM (
+                    SELECT code, title, genre,
+                           ROW_NUMBER() OVER (PARTITION BY genre ORDER BY id DESC) AS rn
+                    FROM movies
+                )
+                WHERE rn <= ?
+            ''', (per_genre,))
+            return cursor.fetchall()
+    except Exception as e:
+        logger.error("❌ Janrlar bo'yicha filmlarni olishda xato: %s", e)
+        return []
+
+
+def _fts_query(text: str) -> str:
+    """Foydalanuvchi matnini xavfsiz FTS5 prefiks so'roviga aylantirish"""
+    words = re.findall(r"\w+", text.lower())[:8]
+    return " ".join(f'"{word}"*' for word in words)
+
+def search_movies(text: str, limit: int = 10, conn: Optional[sqlite3.Connection] = None) -> List[Tuple]:
+    """Nom va tavsif bo'yicha to'liq matnli qidiruv: (code, title, file_id, description)"""
+    query = _fts_query(text)
+    if not query:
+        return []
+    
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT m.code, m.title, m.file_id, m.description 
+                FROM movies_fts 
+                JOIN movies m ON m.id = movies_fts.rowid 
+                WHERE movies_fts MATCH ? 
+                ORDER BY bm25(movies_fts, 10.0, 1.0) 
+                LIMIT ?
+            ''', (query, limit))
+            return cursor.fetchall()
+    except Exception as e:
+        logger.error("❌ Film qidirishda xato: %s", e)
+        return []
+
+def record_views(events: List[Tuple[str, int, str, str, str]], conn: Optional[sqlite3.Connection] = None) -> bool:
+    """(code, user_id, viewed_at, day, week) hodisalarini yozish va hisoblagichlarni bitta tranzaksiyada yangilash"""
+    if not events:
+        return True
+    
+    daily: dict = {}
+    weekly: dict = {}
+    for code, _, _, day, week in events:
+        daily[(day, code)] = daily.get((day, code), 0) + 1
+        weekly[(week, code)] = weekly.get((week, code), 0) + 1
+    
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.executemany(
+                'INSERT INTO view_events (code, user_id, viewed_at) VALUES (?, ?, ?)',
+                [(code, user_id, viewed_at) for code, user_id, viewed_at, _, _ in events]
+            )
+            for kind, counts in (('daily', daily), ('weekly', weekly)):
+                table, period = _VIEW_TABLES[kind]
+                cursor.executemany(f'''
+                    INSERT INTO {table} ({period}, code, views) VALUES (?, ?, ?)
+                    ON CONFLICT ({period}, code) DO UPDATE SET views = views + excluded.views
+                ''', [(key, code, views) for (key, code), views in counts.items()])
+            
+            conn.commit()
+            return True
+    except Exception as e:
+        logger.error("❌ Ko'rishlarni yozishda xato: %s", e)
+        return False
+
+def get_top_views(kind: str, period: str, limit: int, conn: Optional[sqlite3.Connection] = None) -> List[Tuple]:
+    """Davr bo'yicha eng ko'p ko'rilgan filmlar: (code, views)"""
+    table, column = _VIEW_TABLES[kind]
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(f'''
+                SELECT code, views FROM {table} 
+                WHERE {column} = ? 
+                ORDER BY views DESC 
+                LIMIT ?
+            ''', (period, limit))
+            return cursor.fetchall()
+    except Exception as e:
+        logger.error("❌ Top ko'rishlarni olishda xato: %s", e)
+        return []
+
+def prune_views(before_day: str, before_week: str, before_time: str,
+                conn: Optional[sqlite3.Connection] = None) -> bool:
+    """Eski hodisalar va hisoblagichlarni o'chirish"""
+    try:
+        with _connection(conn) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('DELETE FROM view_events WHERE viewed_at < ?', (before_time,))
+            cursor.execute('DELETE FROM movie_views_daily WHERE day < ?', (before_day,))
+            cursor.execute('DELETE FROM movie_views_weekly WHERE week < ?', (before_week,))
+            conn.commit()
+            return True
+    except Exception as e:
+        logger.error("❌ Eski ko'rishlarni o'chirishda xato: %s", e)
+        return False
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+from typing import List, Optional, Sequence
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import InputMediaVideo, Message
+
+import repository
+from broadcast import TokenBucket
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+MEDIA_GROUP_LIMIT = 10
+
+
+class VideoSender:
+    """Filmlarni umumiy tezlik va parallellik chegarasi ostida yuborish.
+
+    Ko'p qismli filmlar sendMediaGroup bilan albom qilib yuboriladi.
+    """
+
+    def __init__(self, bot, rate: float = 25, concurrency: int = 20, max_retries: int = 2):
+        self.bot = bot
+        self.bucket = TokenBucket(rate)
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def send_movie(self, chat_id: int, file_id: str, description: str,
+                         parts: Optional[Sequence[str]] = None) -> List[Message]:
+        """Filmni (yoki uning barcha qismlarini) foydalanuvchiga yuborish"""
+        file_ids = list(parts) if parts and len(parts) > 1 else [file_id]
+        messages: List[Message] = []
+        async with self._semaphore:
+            for start in range(0, len(file_ids), MEDIA_GROUP_LIMIT):
+                group = file_ids[start:start + MEDIA_GROUP_LIMIT]
+                caption = description if start == 0 else None
+                messages.extend(await self._send_group(chat_id, group, caption))
+        return messages
+
+    async def _send_group(self, chat_id: int, file_ids: List[str], caption: Optional[str]) -> List[Message]:
+        if len(file_ids) == 1:
+            message = await self._call(self.bot.send_video, chat_id=chat_id, video=file_ids[0], caption=caption)
+            return [message]
+        media = [
+            InputMediaVideo(media=file_id, caption=caption if i == 0 else None)
+            for i, file_id in enumerate(file_ids)
+        ]
+        return await self._call(self.bot.send_media_group, chat_id=chat_id, media=media)
+
+    async def _call(self, method, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                return await method(**kwargs)
+            except TelegramRetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning("Telegram cheklovi (video): %ss kutilmoqda", e.retry_after)
+                self.bucket.pause(e.retry_after)
+
+
+class FileIdValidator:
+    """Saqlangan file_id larni vaqti-vaqti bilan getFile orqali tekshirish.
+
+    Yaroqsiz file_id ni qayta tiklash uchun asl fayl kerak, shuning uchun
+    bunday filmlar kodlari adminga qayta yuklash uchun yuboriladi.
+    """
+
+    def __init__(self, bot, admin_id: int, interval: float = 86400, rate: float = 1,
+                 chunk_size: int = 200, start_delay: float = 60):
+        self.bot = bot
+        self.admin_id = admin_id
+        self.interval = interval
+        self.bucket = TokenBucket(rate)
+        self.chunk_size = chunk_size
+        self.start_delay = start_delay
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        await asyncio.sleep(self.start_delay)
+        while True:
+            try:
+                invalid = await self.run_once()
+                if invalid:
+                    await self._report(invalid)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("file_id tekshiruvi to'xtadi: %s", e)
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> List[str]:
+        """Barcha file_id larni bir marta tekshirish, yaroqsiz film kodlarini qaytarish"""
+        invalid: List[str] = []
+        after_id = 0
+        while True:
+            rows = await repository.get_file_ids_chunk(after_id, self.chunk_size)
+            if not rows:
+                break
+            for movie_id, code, file_id in rows:
+                if not await self._check(file_id) and code not in invalid:
+                    invalid.append(code)
+                after_id = movie_id
+        logger.info("🔎 file_id tekshiruvi tugadi, yaroqsiz: %s", len(invalid))
+        return invalid
+
+    async def _check(self, file_id: str) -> bool:
+        while True:
+            await self.bucket.acquire()
+            try:
+                await self.bot.get_file(file_id)
+                result = True
+            except TelegramRetryAfter as e:
+                self.bucket.pause(e.retry_after)
+                continue
+            except TelegramBadRequest as e:
+                # 20 MB dan katta fayllarni getFile bermaydi, lekin file_id yaroqli
+                result = "too big" in str(e).lower()
+            metrics.inc("bot_file_checks_total", (("result", "ok" if result else "invalid"),))
+            return result
+
+    async def _report(self, codes: List[str]):
+        text = (
+            f"⚠️ {len(codes)} ta filmning videosi Telegramda topilmadi.\n"
+            f"Qayta yuklash kerak bo'lgan kodlar:\n" + ", ".join(codes[:200])
+        )
+        try:
+            await self.bot.send_message(self.admin_id, text)
+        except Exception as e:
+            logger.warning("Adminga xabar yuborilmadi: %s", e)
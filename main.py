@@ -1,31 +1,75 @@
+import time
+
+_import_started = time.perf_counter()
+
+import argparse
 import asyncio
 import logging
-import sqlite3
-import os
 
 from aiogram import Bot, Dispatcher, types, F
-from aiogram.filters import CommandStart, Command
+from aiogram.filters import CommandStart, Command, CommandObject
 from aiogram.client.default import DefaultBotProperties
 from aiogram.types import ReplyKeyboardRemove
 from aiogram.fsm.context import FSMContext
 from aiogram.exceptions import TelegramForbiddenError
 
-from config import TOKEN, ADMIN_ID, CHANNEL_USERNAME
+from config import (
+    TOKEN, ADMIN_ID, CHANNEL_USERNAME, SUB_CACHE_POSITIVE_TTL, SUB_CACHE_NEGATIVE_TTL, SUB_CACHE_SIZE,
+    BROADCAST_RATE, BROADCAST_WORKERS, BROADCAST_CHUNK_SIZE, BROADCAST_WORKER_ENABLED,
+    REDIS_URL, LOG_LEVEL, LOG_FORMAT, LOG_LEVELS,
+    BOT_MODE, WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET, WEBAPP_HOST, WEBAPP_PORT, WEBHOOK_MAX_CONCURRENCY,
+    METRICS_HOST, METRICS_PORT, THROTTLE_RATE, THROTTLE_BURST, THROTTLE_CALLBACK_WINDOW,
+    VIDEO_SEND_RATE, VIDEO_SEND_CONCURRENCY, FILE_CHECK_INTERVAL, FILE_CHECK_RATE
+)
 from buttons.default import phone_btn, stats_btn
 from buttons.inline import sub_keyboard
-from database import init_db, add_user, get_user, add_movie, get_movie_by_code, get_all_movies, get_total_movies_count, get_movies_by_page
+from database import init_db
+from repository import is_registered, load_registered_users, add_movie, allocate_movie_code, get_movie_by_code, get_movie_parts, warm_movie_cache, load_catalog, get_total_movies_count, get_total_users_count, get_top_movies_by_genre, search_movies, create_broadcast_job, invalidation_bus, handle_invalidation, close_pool
 from state import AdminMovie, ReklamaState
-from movie_code import generate_move_code
 from movie_stats import MovieStats
-from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from subscription import SubscriptionCache
+from movie_pages import render_movie_page, parse_page_callback
+from movie_export import send_movie_list, send_movie_file
+from storage import create_fsm_storage
+from log_setup import setup_logging
+from metrics import metrics, setup_metrics, start_metrics_server, count_outcome
+from movie_cache import movie_cache
+from broadcast import BroadcastWorker
+from throttling import setup_throttling
+from delivery import VideoSender, FileIdValidator
+from popularity import popularity
+from user_queue import user_queue
+from startup import StartupTimer, Readiness, import_breakdown, format_report
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, InlineQueryResultCachedVideo
+
+startup_timer = StartupTimer(_import_started)
+startup_timer.mark("import", startup_timer.elapsed())
+
+setup_logging(LOG_LEVEL, LOG_FORMAT, LOG_LEVELS)
+logger = logging.getLogger("main")
 
 bot = Bot(token=TOKEN, default=DefaultBotProperties(parse_mode="HTML"))
-dp = Dispatcher()
+dp = Dispatcher(storage=create_fsm_storage(REDIS_URL))
+subscription_cache = SubscriptionCache(SUB_CACHE_POSITIVE_TTL, SUB_CACHE_NEGATIVE_TTL, SUB_CACHE_SIZE)
+broadcast_worker = BroadcastWorker(bot, BROADCAST_RATE, BROADCAST_WORKERS, BROADCAST_CHUNK_SIZE)
+video_sender = VideoSender(bot, VIDEO_SEND_RATE, VIDEO_SEND_CONCURRENCY)
+file_validator = FileIdValidator(bot, ADMIN_ID, FILE_CHECK_INTERVAL, FILE_CHECK_RATE)
+setup_metrics(dp, bot)
+if THROTTLE_RATE > 0:
+    setup_throttling(dp, THROTTLE_RATE, THROTTLE_BURST, THROTTLE_CALLBACK_WINDOW, exempt=[ADMIN_ID])
+
+def cache_metrics():
+    values = {}
+    for cache_name, stats in (("movie", movie_cache.stats()), ("subscription", subscription_cache.stats())):
+        for stat, value in stats.items():
+            if value is not None:
+                values[(f"bot_cache_{stat}", (("cache", cache_name),))] = value
+    return values
+
+metrics.add_collector(cache_metrics)
+readiness = Readiness()
+metrics.add_collector(readiness.collect)
+startup_timer.mark("setup", startup_timer.elapsed() - startup_timer.stages[0][1])
 
 @dp.message(CommandStart())
 async def start_handler(message: types.Message):
@@ -38,10 +82,9 @@ async def start_handler(message: types.Message):
         )
         return
     
-    user = get_user(user_id)
     full_name = message.from_user.full_name
     
-    if user:
+    if await is_registered(user_id):
         await message.answer(
             f"🎬 <b>Kino botga xush kelibsiz, {full_name}!</b>\n\n"
             "Film kodini yuboring yoki statistikani ko'ring:",
@@ -58,7 +101,7 @@ async def start_handler(message: types.Message):
 async def check_subscription_callback(call: types.CallbackQuery):
     user_id = call.from_user.id
     
-    if await check_subscription(user_id):
+    if await check_subscription(user_id, force=True):
         await call.message.delete()
         await call.message.answer(
             "✅ Obuna tasdiqlandi!\n"
@@ -71,15 +114,18 @@ async def check_subscription_callback(call: types.CallbackQuery):
             show_alert=True
         )
 
-async def check_subscription(user_id: int) -> bool:
+async def fetch_subscription(user_id: int) -> bool:
+    member = await bot.get_chat_member(CHANNEL_USERNAME, user_id)
+    return member.status in ["member", "administrator", "creator"]
+
+async def check_subscription(user_id: int, force: bool = False) -> bool:
     try:
-        member = await bot.get_chat_member(CHANNEL_USERNAME, user_id)
-        return member.status in ["member", "administrator", "creator"]
+        return await subscription_cache.get(user_id, fetch_subscription, force=force)
     except TelegramForbiddenError:
-        logging.error(f"Bot kanalda admin emas yoki kanal topilmadi: {CHANNEL_USERNAME}")
+        logger.error("Bot kanalda admin emas yoki kanal topilmadi: %s", CHANNEL_USERNAME)
         return False
     except Exception as e:
-        logging.error(f"Obunani tekshirishda xato: {e}")
+        logger.error("Obunani tekshirishda xato: %s", e)
         return False
 
 @dp.message(F.contact)
@@ -94,10 +140,10 @@ async def get_user_contact(message: types.Message):
         return
     
     try:
-        existing_user = get_user(user_id)
+        existing_user = await is_registered(user_id)
+        success = await user_queue.upsert(user_id, full_name, username, phone_number)
         
-        if existing_user:
-            add_user(user_id, full_name, username, phone_number)
+        if existing_user and success:
             await message.answer(
                 "✅ Ma'lumotlaringiz yangilandi!\n\n"
                 "Film kodini yuboring yoki statistikani ko'ring:",
@@ -105,8 +151,6 @@ async def get_user_contact(message: types.Message):
                 parse_mode="HTML"
             )
         else:
-            success = add_user(user_id, full_name, username, phone_number)
-            
             if success:
                 await message.answer(
                     "<b><i>Ro'yxatdan o'tdingiz 🥳</i></b>\n\n"
@@ -119,7 +163,7 @@ async def get_user_contact(message: types.Message):
                     "❌ Ro'yxatdan o'tishda xatolik yuz berdi. Iltimos, qayta urinib ko'ring."
                 )
     except Exception as e:
-        logging.error(f"Error in get_user_contact: {e}")
+        logger.error("Error in get_user_contact: %s", e)
         await message.answer(
             "❌ Texnik xatolik yuz berdi. Iltimos, keyinroq urinib ko'ring."
         )
@@ -140,13 +184,23 @@ async def admin_handler(message: types.Message, state: FSMContext):
 @dp.message(AdminMovie.movie_file, F.video)
 async def get_movie_file(message: types.Message, state: FSMContext):
     movie_file = message.video.file_id
-    await state.update_data(movie_file=movie_file)
+    await state.update_data(movie_file=movie_file, movie_parts=[movie_file])
     await message.answer(
         "✅ Film qabul qilindi\n\n"
-        "📝 Tavsifini yuboring"
+        "📝 Tavsifini yuboring yoki keyingi qismini yuboring"
     )
     await state.set_state(AdminMovie.movie_desc)
 
+@dp.message(AdminMovie.movie_desc, F.video)
+async def get_movie_part(message: types.Message, state: FSMContext):
+    data = await state.get_data()
+    movie_parts = data.get('movie_parts', []) + [message.video.file_id]
+    await state.update_data(movie_parts=movie_parts)
+    await message.answer(
+        f"✅ {len(movie_parts)}-qism qabul qilindi\n\n"
+        "📝 Tavsifini yuboring yoki keyingi qismini yuboring"
+    )
+
 @dp.message(AdminMovie.movie_desc)
 async def get_movie_desc(message: types.Message, state: FSMContext):
     movie_desc = message.text
@@ -155,18 +209,23 @@ async def get_movie_desc(message: types.Message, state: FSMContext):
     data = await state.get_data()
     movie_file = data.get('movie_file')
     movie_desc = data.get('movie_desc')
+    movie_parts = data.get('movie_parts') or [movie_file]
 
     if not movie_file or not movie_desc:
         await message.answer("❌ Ma'lumotlar to'liq emas")
         await state.clear()
         return
 
-    code = generate_move_code()
+    code = await allocate_movie_code()
+    if code is None:
+        await message.answer("❌ Film kodini ajratib bo'lmadi")
+        await state.clear()
+        return
     
-    print(f"🎬 YANGI FILM YUKLANMOQDA:")
-    print(f"📁 File ID: {movie_file}")
-    print(f"📝 Description: {movie_desc}")
-    print(f"🔢 Generated Code: {code}")
+    logger.debug("🎬 YANGI FILM YUKLANMOQDA:")
+    logger.debug("📁 File ID: %s", movie_file)
+    logger.debug("📝 Description: %s", movie_desc)
+    logger.debug("🔢 Generated Code: %s", code)
 
     lines = movie_desc.split('\n')
     new_lines = []
@@ -178,42 +237,35 @@ async def get_movie_desc(message: types.Message, state: FSMContext):
 
     final_desc = '\n'.join(new_lines)
     
-    success = add_movie(movie_file, final_desc, code)
+    success = await add_movie(movie_file, final_desc, code, movie_parts)
     
     if success:
-        await message.answer_video(movie_file, caption=final_desc)
-        await message.answer(f"✅ Film muvaffaqiyatli yuklandi!\n🎬 Kodi: {code}")
-        print(f"✅ FILM BAZAGA SAQLANDI: {code}")
+        parts_info = f"\n🎞 Qismlar: {len(movie_parts)}" if len(movie_parts) > 1 else ""
+        await message.answer(f"✅ Film muvaffaqiyatli yuklandi!\n🎬 Kodi: {code}{parts_info}")
+        logger.info("✅ FILM BAZAGA SAQLANDI: %s", code)
     else:
         await message.answer("❌ Film bazaga saqlanmadi!")
-        print(f"❌ FILM BAZAGA SAQLANMADI: {code}")
+        logger.error("❌ FILM BAZAGA SAQLANMADI: %s", code)
     
     await state.clear()
 
 @dp.message(Command("all"))
-async def all_movies_handler(message: types.Message):
+async def all_movies_handler(message: types.Message, command: CommandObject):
     user_id = message.from_user.id
 
     if user_id != ADMIN_ID:
         await message.answer("❌ Bu buyruq faqat admin uchun!")
         return
     
-    movies = get_all_movies()
-    
-    if not movies:
-        await message.answer("📭 Hozircha filmlar mavjud emas")
-        return
-    
-    response = "🎬 BARCHA FILMLAR RO'YXATI:\n\n"
+    fmt = (command.args or "").strip().lower()
     
-    for i, (code, desc) in enumerate(movies, 1):
-        desc_lines = desc.split('\n')
-        title = desc_lines[0] if desc_lines else "Nomsiz film"
-        
-        response += f"{i}. {title}\n"
-        response += f"   🔢 Kodi: <code>{code}</code>\n\n"
+    if fmt in ("csv", "txt"):
+        sent = await send_movie_file(message, fmt)
+    else:
+        sent = await send_movie_list(message)
     
-    await message.answer(response)
+    if not sent:
+        await message.answer("📭 Hozircha filmlar mavjud emas")
 
 @dp.message(Command("allpage"))
 async def all_movies_paginated_handler(message: types.Message):
@@ -223,42 +275,18 @@ async def all_movies_paginated_handler(message: types.Message):
         await message.answer("❌ Bu buyruq faqat admin uchun!")
         return
     
-    total_movies = get_total_movies_count()
-    page = 1
-    limit = 10
-    
-    movies = get_movies_by_page(page, limit)
+    page = await render_movie_page(1)
     
-    if not movies:
+    if not page:
         await message.answer("📭 Hozircha filmlar mavjud emas")
         return
     
-    response = f"🎬 FILMLAR (1-sahifa) - Jami: {total_movies} ta\n\n"
-    
-    for i, (code, desc) in enumerate(movies, 1):
-        desc_lines = desc.split('\n')
-        title = desc_lines[0] if desc_lines else "Nomsiz film"
-        
-        response += f"{i}. {title}\n"
-        response += f"   🔢 Kodi: <code>{code}</code>\n\n"
-    
-    keyboard = []
-    if total_movies > limit:
-        keyboard.append([InlineKeyboardButton(
-            text="Keyingi sahifa →", 
-            callback_data=f"next_page_{page+1}"
-        )])
-    
-    reply_markup = InlineKeyboardMarkup(inline_keyboard=keyboard)
-    
+    response, reply_markup = page
     await message.answer(response, reply_markup=reply_markup)
 
 @dp.callback_query(F.data.startswith("next_page_"))
 async def next_page_handler(callback: types.CallbackQuery):
-    try:
-        page = int(callback.data.split("_")[2])
-    except (IndexError, ValueError):
-        page = 1
+    page, last_id = parse_page_callback(callback.data)
     
     user_id = callback.from_user.id
 
@@ -266,49 +294,19 @@ async def next_page_handler(callback: types.CallbackQuery):
         await callback.answer("❌ Ruxsat yo'q!", show_alert=True)
         return
     
-    limit = 10
-    movies = get_movies_by_page(page, limit)
-    total_movies = get_total_movies_count()
+    rendered = await render_movie_page(page, before_id=last_id) if last_id else await render_movie_page(1)
     
-    if not movies:
+    if not rendered:
         await callback.answer("✅ Boshqa film yo'q", show_alert=True)
         return
     
-    start_num = (page - 1) * limit + 1
-    response = f"🎬 FILMLAR ({page}-sahifa) - Jami: {total_movies} ta\n\n"
-    
-    for i, (code, desc) in enumerate(movies, start_num):
-        desc_lines = desc.split('\n')
-        title = desc_lines[0] if desc_lines else "Nomsiz film"
-        
-        response += f"{i}. {title}\n"
-        response += f"   🔢 Kodi: <code>{code}</code>\n\n"
-    
-    keyboard_buttons = []
-    
-    if page > 1:
-        keyboard_buttons.append([InlineKeyboardButton(
-            text="← Oldingi sahifa", 
-            callback_data=f"prev_page_{page-1}"
-        )])
-    
-    if total_movies > page * limit:
-        keyboard_buttons.append([InlineKeyboardButton(
-            text="Keyingi sahifa →", 
-            callback_data=f"next_page_{page+1}"
-        )])
-    
-    reply_markup = InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
-    
+    response, reply_markup = rendered
     await callback.message.edit_text(response, reply_markup=reply_markup)
     await callback.answer()
 
 @dp.callback_query(F.data.startswith("prev_page_"))
 async def prev_page_handler(callback: types.CallbackQuery):
-    try:
-        page = int(callback.data.split("_")[2])
-    except (IndexError, ValueError):
-        page = 1
+    page, first_id = parse_page_callback(callback.data)
     
     user_id = callback.from_user.id
 
@@ -316,46 +314,19 @@ async def prev_page_handler(callback: types.CallbackQuery):
         await callback.answer("❌ Ruxsat yo'q!", show_alert=True)
         return
     
-    limit = 10
-    movies = get_movies_by_page(page, limit)
-    total_movies = get_total_movies_count()
+    rendered = await render_movie_page(page, after_id=first_id) if first_id else await render_movie_page(1)
     
-    if not movies:
+    if not rendered:
         await callback.answer("❌ Sahifa topilmadi", show_alert=True)
         return
     
-    start_num = (page - 1) * limit + 1
-    response = f"🎬 FILMLAR ({page}-sahifa) - Jami: {total_movies} ta\n\n"
-    
-    for i, (code, desc) in enumerate(movies, start_num):
-        desc_lines = desc.split('\n')
-        title = desc_lines[0] if desc_lines else "Nomsiz film"
-        
-        response += f"{i}. {title}\n"
-        response += f"   🔢 Kodi: <code>{code}</code>\n\n"
-    
-    keyboard_buttons = []
-    
-    if page > 1:
-        keyboard_buttons.append([InlineKeyboardButton(
-            text="← Oldingi sahifa", 
-            callback_data=f"prev_page_{page-1}"
-        )])
-    
-    if total_movies > page * limit:
-        keyboard_buttons.append([InlineKeyboardButton(
-            text="Keyingi sahifa →", 
-            callback_data=f"next_page_{page+1}"
-        )])
-    
-    reply_markup = InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
-    
+    response, reply_markup = rendered
     await callback.message.edit_text(response, reply_markup=reply_markup)
     await callback.answer()
 
 @dp.message(Command("random"))
 async def random_movies_handler(message: types.Message):
-    random_movies = MovieStats.get_random_top_movies(5)
+    random_movies = await MovieStats.get_random_top_movies(5)
     response = MovieStats.format_movie_stats(random_movies, "🎲 Tasodifiy Top 5 Film")
     
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -381,21 +352,21 @@ async def random_movies_handler(message: types.Message):
 
 @dp.message(Command("today"))
 async def today_top_handler(message: types.Message):
-    today_movies = MovieStats.get_today_top_movies(3)
+    today_movies = await MovieStats.get_today_top_movies(3)
     response = MovieStats.format_movie_stats(today_movies, "🌟 Bugungi Top Filmlar")
     
     await message.answer(response)
 
 @dp.message(Command("weekly"))
 async def weekly_top_handler(message: types.Message):
-    weekly_movies = MovieStats.get_weekly_top_movies(5)
+    weekly_movies = await MovieStats.get_weekly_top_movies(5)
     response = MovieStats.format_movie_stats(weekly_movies, "📅 Haftalik Top 5 Film")
     
     await message.answer(response)
 
 @dp.message(Command("genres"))
 async def genres_handler(message: types.Message):
-    genre_movies = MovieStats.get_popular_by_genre()
+    genre_movies = MovieStats.get_popular_by_genre(await get_top_movies_by_genre(2))
     response = MovieStats.format_genre_stats(genre_movies)
     
     await message.answer(response)
@@ -403,12 +374,10 @@ async def genres_handler(message: types.Message):
 @dp.message(Command("recommend"))
 async def recommend_handler(message: types.Message):
     user_id = message.from_user.id
-    recommended = MovieStats.get_recommended_movie(user_id)
+    recommended = await MovieStats.get_recommended_movie(user_id)
     
     if recommended:
-        code, desc = recommended
-        desc_lines = desc.split('\n')
-        film_title = desc_lines[0] if desc_lines else "Nomsiz film"
+        code, film_title, _ = recommended
         
         response = f"🎯 <b>Siz uchun tavsiya:</b>\n\n"
         response += f"<b>{film_title}</b>\n"
@@ -448,7 +417,7 @@ async def back_button_handler(message: types.Message):
 
 @dp.callback_query(F.data == "refresh_random")
 async def refresh_random_handler(callback: types.CallbackQuery):
-    random_movies = MovieStats.get_random_top_movies(5)
+    random_movies = await MovieStats.get_random_top_movies(5)
     response = MovieStats.format_movie_stats(random_movies, "🎲 Tasodifiy Top 5 Film")
     
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -475,7 +444,7 @@ async def refresh_random_handler(callback: types.CallbackQuery):
 
 @dp.callback_query(F.data == "today_top")
 async def today_top_callback_handler(callback: types.CallbackQuery):
-    today_movies = MovieStats.get_today_top_movies(3)
+    today_movies = await MovieStats.get_today_top_movies(3)
     response = MovieStats.format_movie_stats(today_movies, "🌟 Bugungi Top Filmlar")
     
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -492,7 +461,7 @@ async def today_top_callback_handler(callback: types.CallbackQuery):
 
 @dp.callback_query(F.data == "weekly_top")
 async def weekly_top_callback_handler(callback: types.CallbackQuery):
-    weekly_movies = MovieStats.get_weekly_top_movies(5)
+    weekly_movies = await MovieStats.get_weekly_top_movies(5)
     response = MovieStats.format_movie_stats(weekly_movies, "📅 Haftalik Top 5 Film")
     
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -551,39 +520,16 @@ async def get_reklama_text(message: types.Message, state: FSMContext):
 async def send_reklama_callback(callback: types.CallbackQuery, state: FSMContext):
     data = await state.get_data()
     reklama_text = data.get('reklama_text', '')
+    await state.clear()
     
     await callback.message.edit_text("📤 Reklama yuborilmoqda...")
     
-    conn = sqlite3.connect('movie_bot.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT user_id FROM users')
-    users = cursor.fetchall()
-    conn.close()
-    
-    success_count = 0
-    error_count = 0
-    
-    for user in users:
-        user_id = user[0]
-        try:
-            await bot.send_message(
-                chat_id=user_id,
-                text=f"📢 <b>E'lon:</b>\n\n{reklama_text}",
-                parse_mode="HTML"
-            )
-            success_count += 1
-            await asyncio.sleep(0.1)
-        except Exception as e:
-            error_count += 1
-            logging.error(f"Reklama {user_id} ga yuborilmadi: {e}")
-    
-    await callback.message.edit_text(
-        f"✅ Reklama yuborish tugadi!\n\n"
-        f"✅ Muvaffaqiyatli: {success_count}\n"
-        f"❌ Xatolik: {error_count}\n"
-        f"👥 Jami: {len(users)}"
-    )
-    await state.clear()
+    job_id = await create_broadcast_job(reklama_text, callback.message.chat.id, callback.message.message_id)
+    if job_id is None:
+        await callback.message.edit_text("❌ Reklama vazifasini yaratib bo'lmadi")
+    else:
+        broadcast_worker.notify()
+    
     await callback.answer()
 
 @dp.callback_query(F.data == "cancel_reklama")
@@ -594,78 +540,136 @@ async def cancel_reklama_callback(callback: types.CallbackQuery, state: FSMConte
 
 @dp.message(F.text)
 async def send_movie_by_code(message: types.Message):
-    print(f"🔍 USER KOD KIRITDI: {message.text}")
+    logger.debug("🔍 USER KOD KIRITDI: %s", message.text)
     
     if not message.text.isdigit():
-        await message.answer("❌ Iltimos faqat film kodini yuboring")
+        await search_movies_handler(message)
         return
 
     movie_code = message.text
     
-    print(f"🔍 KOD TEKSHIRILMOQDA: {movie_code}")
+    logger.debug("🔍 KOD TEKSHIRILMOQDA: %s", movie_code)
     
-    movie = get_movie_by_code(movie_code)
+    movie = await get_movie_by_code(movie_code)
 
     if movie:
         movie_file, movie_desc = movie
-        await message.answer_video(
-            video=movie_file,
-            caption=movie_desc
-        )
-        print(f"✅ FILM TOPILDI VA YUBORILDI: {movie_code}")
+        parts = await get_movie_parts(movie_code)
+        await video_sender.send_movie(message.chat.id, movie_file, movie_desc, parts)
+        popularity.record(movie_code, message.from_user.id)
+        count_outcome("send_movie_by_code", "found")
+        logger.debug("✅ FILM TOPILDI VA YUBORILDI: %s", movie_code)
     else:
         await message.answer("❌ Bunday film kodi topilmadi")
-        print(f"❌ FILM TOPILMADI: {movie_code}")
+        count_outcome("send_movie_by_code", "not_found")
+        logger.debug("❌ FILM TOPILMADI: %s", movie_code)
 
-async def main():
-    if os.path.exists('movie_bot.db'):
-        print("✅ Database fayli mavjud")
-    else:
-        print("📂 Database fayli mavjud emas, yangisi yaratiladi...")
+async def search_movies_handler(message: types.Message):
+    results = await search_movies(message.text, 10)
     
-
-    init_db()
+    if not results:
+        await message.answer("❌ Hech narsa topilmadi. Film kodini yoki nomini yuboring")
+        count_outcome("search_movies_handler", "not_found")
+        return
     
-
-    conn = sqlite3.connect('movie_bot.db')
-    cursor = conn.cursor()
+    count_outcome("search_movies_handler", "found")
     
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = cursor.fetchall()
-    print(f"📊 Database jadvallari: {tables}")
+    response = "🔎 <b>Qidiruv natijalari:</b>\n\n"
+    for i, (code, title, _, _) in enumerate(results, 1):
+        response += f"{i}. {title}\n"
+        response += f"   🔢 Kodi: <code>{code}</code>\n\n"
     
-    if ('movies',) in tables:
-        cursor.execute("PRAGMA table_info(movies);")
-        columns = cursor.fetchall()
-        print(f"📋 Movies jadvali ustunlari:")
-        for col in columns:
-            print(f"  {col}")
-        
-        cursor.execute('SELECT COUNT(*) FROM movies')
-        movie_count = cursor.fetchone()[0]
-        print(f"🎬 Bazadagi filmlar soni: {movie_count}")
+    await message.answer(response)
+
+@dp.inline_query()
+async def inline_search_handler(inline_query: types.InlineQuery):
+    query = inline_query.query.strip()
+    results = await search_movies(query, 20) if query else []
     
-    if ('users',) in tables:
-        cursor.execute('SELECT COUNT(*) FROM users')
-        user_count = cursor.fetchone()[0]
-        print(f"👥 Bazadagi foydalanuvchilar soni: {user_count}")
+    await inline_query.answer(
+        [
+            InlineQueryResultCachedVideo(
+                id=code,
+                video_file_id=file_id,
+                title=title,
+                description=f"🔢 Kodi: {code}",
+                caption=description[:1024]
+            )
+            for code, title, file_id, description in results
+        ],
+        cache_time=300
+    )
+
+async def log_diagnostics() -> str:
+    movies_count = await get_total_movies_count()
+    users_count = await get_total_users_count()
+    return f"{movies_count} film, {users_count} foydalanuvchi"
+
+def start_background_warmup():
+    """Keshlar va statistikani fonda tayyorlash, bot shu paytda update qabul qiladi"""
+    readiness.run("movie_cache", warm_movie_cache)
+    readiness.run("catalog", load_catalog)
+    readiness.run("registered_users", load_registered_users)
+    readiness.run("diagnostics", log_diagnostics)
+
+async def profile_startup():
+    with startup_timer.stage("init_db"):
+        init_db()
+    start_background_warmup()
+    startup_timer.mark("jami (polling boshlanishigacha)", startup_timer.elapsed())
+    await readiness.wait()
+    close_pool()
+    print(format_report(startup_timer, readiness, import_breakdown("main")))
+
+async def main():
+    with startup_timer.stage("init_db"):
+        init_db()
+    with startup_timer.stage("invalidation_bus"):
+        await invalidation_bus.start(handle_invalidation)
+    start_background_warmup()
     
-    conn.close()
+    if BROADCAST_WORKER_ENABLED:
+        broadcast_worker.start()
+    if FILE_CHECK_INTERVAL > 0:
+        file_validator.start()
+    popularity.start()
+    metrics_runner = await start_metrics_server(METRICS_HOST, METRICS_PORT) if METRICS_PORT else None
     
-    print("🤖 Bot ishga tushmoqda...")
+    logger.info("🤖 Bot ishga tushmoqda... (%.0f ms)", startup_timer.elapsed() * 1000)
 
     try:
-        await dp.start_polling(bot)
+        if BOT_MODE == "webhook":
+            from webhook import run_webhook
+
+            await run_webhook(
+                dp, bot, WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_SECRET,
+                WEBAPP_HOST, WEBAPP_PORT, WEBHOOK_MAX_CONCURRENCY
+            )
+        else:
+            await dp.start_polling(bot)
     except KeyboardInterrupt:
-        print("\n🛑 Bot to'xtatildi (Ctrl+C)")
+        logger.info("🛑 Bot to'xtatildi (Ctrl+C)")
     except Exception as e:
-        print(f"❌ Bot ishlashda xato: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Bot ishlashda xato: %s", e)
+    finally:
+        await readiness.cancel()
+        await broadcast_worker.stop()
+        await file_validator.stop()
+        await popularity.stop()
+        await user_queue.stop()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        await invalidation_bus.close()
+        await dp.storage.close()
+        close_pool()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Import va ishga tushish bosqichlari vaqtini chiqarib, botni ishga tushirmasdan chiqish")
+    args = parser.parse_args()
 
     try:
-        asyncio.run(main())
+        asyncio.run(profile_startup() if args.profile_startup else main())
     except KeyboardInterrupt:
-        print("\n🛑 Dastur to'xtatildi")
\ No newline at end of file
+        logger.info("🛑 Dastur to'xtatildi")
@@ -0,0 +1,148 @@
+import logging
+import time
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Prometheus uslubidagi kechikish gistogrammasi"""
+
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Jarayon ichidagi hisoblagichlar va gistogrammalar"""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._collectors: List[Callable[[], Dict[Tuple[str, Tuple], float]]] = []
+
+    def observe(self, name: str, value: float, labels: Tuple[Tuple[str, str], ...] = ()):
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def inc(self, name: str, labels: Tuple[Tuple[str, str], ...] = (), value: float = 1):
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def add_collector(self, collector: Callable[[], Dict[Tuple[str, Tuple], float]]):
+        """render() paytida o'qiladigan gauge qiymatlari manbasini qo'shish"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus text exposition formatida chiqarish"""
+        lines = []
+        for (name, labels), value in sorted(self._counters.items()):
+            lines.append(f"{name}{_labels(labels)} {value}")
+
+        for collector in self._collectors:
+            for (name, labels), value in sorted(collector().items()):
+                lines.append(f"{name}{_labels(labels)} {value}")
+
+        for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+            lines.append(f"{name}_sum{_labels(labels)} {histogram.total}")
+            lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{value}"' for key, value in labels)
+    return "{" + inner + "}"
+
+
+metrics = MetricsRegistry()
+
+
+def count_outcome(handler: str, outcome: str):
+    """Handler natijasini hisoblash (found / not_found / error ...)"""
+    metrics.inc("bot_handler_outcomes_total", (("handler", handler), ("outcome", outcome)))
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Har bir handler uchun kechikish va xatolarni o'lchovchi middleware"""
+
+    async def __call__(self, handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+                       event: Any, data: Dict[str, Any]) -> Any:
+        handler_object = data.get("handler")
+        name = handler_object.callback.__name__ if handler_object is not None else "unknown"
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            count_outcome(name, "error")
+            raise
+        finally:
+            metrics.observe("bot_handler_seconds", time.perf_counter() - start, (("handler", name),))
+
+
+class ApiMetricsMiddleware(BaseRequestMiddleware):
+    """Telegram Bot API so'rovlari vaqtini o'lchash"""
+
+    async def __call__(self, make_request, bot, method):
+        start = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        finally:
+            metrics.observe(
+                "telegram_api_seconds", time.perf_counter() - start,
+                (("method", type(method).__name__),)
+            )
+
+
+def setup_metrics(dp, bot):
+    """Dispatcher va Bot sessiyasiga o'lchov middleware'larini ulash"""
+    middleware = HandlerMetricsMiddleware()
+    for observer in (dp.message, dp.callback_query, dp.inline_query):
+        observer.middleware(middleware)
+    bot.session.middleware(ApiMetricsMiddleware())
+
+
+async def start_metrics_server(host: str, port: int) -> "web.AppRunner":
+    """/metrics HTTP endpointini ishga tushirish"""
+    # aiohttp.web faqat metrika serveri yoqilganda kerak, importi ishga tushishni sekinlatmasin
+    from aiohttp import web
+
+    async def handle_metrics(request: web.Request) -> web.Response:
+        return web.Response(text=metrics.render(), content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info("📈 Metrikalar: http://%s:%s/metrics", host, port)
+    return runner
@@ -0,0 +1,319 @@
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from config import DB_PATH, LEGACY_DB_PATH
+from movie_meta import parse_movie_meta
+
+logger = logging.getLogger(__name__)
+
+
+def _ensure_column(cursor: sqlite3.Cursor, table: str, column: str, definition: str):
+    """Eski bazalarga yetishmayotgan ustunni qo'shish"""
+    cursor.execute(f"PRAGMA table_info({table});")
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        logger.info("🛠 %s.%s ustuni qo'shildi", table, column)
+
+
+def _001_initial(cursor: sqlite3.Cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY,
+            full_name TEXT,
+            username TEXT,
+            phone_number TEXT,
+            registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS movies (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_id TEXT NOT NULL,
+            description TEXT NOT NULL,
+            code TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _002_users_is_active(cursor: sqlite3.Cursor):
+    _ensure_column(cursor, 'users', 'is_active', 'INTEGER NOT NULL DEFAULT 1')
+
+
+def _003_movie_meta(cursor: sqlite3.Cursor):
+    _ensure_column(cursor, 'movies', 'title', 'TEXT')
+    _ensure_column(cursor, 'movies', 'genre', 'TEXT')
+    _ensure_column(cursor, 'movies', 'year', 'INTEGER')
+
+    cursor.execute('SELECT id, description FROM movies WHERE title IS NULL')
+    rows = cursor.fetchall()
+    if rows:
+        cursor.executemany(
+            'UPDATE movies SET title = ?, genre = ?, year = ? WHERE id = ?',
+            [(*parse_movie_meta(description), movie_id) for movie_id, description in rows]
+        )
+        logger.info("🛠 %s ta film uchun metadata to'ldirildi", len(rows))
+
+
+def _004_covering_indexes(cursor: sqlite3.Cursor):
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_active ON users (is_active, user_id)')
+    cursor.execute('DROP INDEX IF EXISTS idx_movies_genre')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_movies_genre_cover ON movies (genre, id, code, title)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_movies_listing ON movies (id, code, title, genre)')
+
+
+def _005_movies_fts(cursor: sqlite3.Cursor):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'movies_fts'")
+    fts_exists = cursor.fetchone() is not None
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5(
+            title, description,
+            content='movies', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS movies_fts_insert AFTER INSERT ON movies
+        BEGIN
+            INSERT INTO movies_fts (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS movies_fts_delete AFTER DELETE ON movies
+        BEGIN
+            INSERT INTO movies_fts (movies_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS movies_fts_update AFTER UPDATE OF title, description ON movies
+        BEGIN
+            INSERT INTO movies_fts (movies_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO movies_fts (rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    ''')
+    if not fts_exists:
+        cursor.execute("INSERT INTO movies_fts (movies_fts) VALUES ('rebuild')")
+        logger.info("🛠 Qidiruv indeksi qurildi")
+
+
+def _006_counters(cursor: sqlite3.Cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO counters (name, value)
+        SELECT 'movies', COUNT(*) FROM movies
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS movies_count_insert AFTER INSERT ON movies
+        BEGIN
+            UPDATE counters SET value = value + 1 WHERE name = 'movies';
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS movies_count_delete AFTER DELETE ON movies
+        BEGIN
+            UPDATE counters SET value = value - 1 WHERE name = 'movies';
+        END
+    ''')
+
+
+def _007_code_allocator(cursor: sqlite3.Cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS code_allocator (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            length INTEGER NOT NULL,
+            next_index INTEGER NOT NULL
+        )
+    ''')
+
+
+def _008_broadcast_jobs(cursor: sqlite3.Cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS broadcast_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            text TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            chat_id INTEGER,
+            message_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS broadcast_recipients (
+            job_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            PRIMARY KEY (job_id, user_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_broadcast_recipients_status
+        ON broadcast_recipients (job_id, status, user_id)
+    ''')
+
+
+def _009_movie_parts(cursor: sqlite3.Cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS movie_parts (
+            movie_id INTEGER NOT NULL,
+            part_no INTEGER NOT NULL,
+            file_id TEXT NOT NULL,
+            PRIMARY KEY (movie_id, part_no)
+        ) WITHOUT ROWID
+    ''')
+
+
+def _010_view_stats(cursor: sqlite3.Cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS view_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            code TEXT NOT NULL,
+            user_id INTEGER,
+            viewed_at TIMESTAMP NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_view_events_time ON view_events (viewed_at)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS movie_views_daily (
+            day TEXT NOT NULL,
+            code TEXT NOT NULL,
+            views INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, code)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_movie_views_daily_top ON movie_views_daily (day, views DESC)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS movie_views_weekly (
+            week TEXT NOT NULL,
+            code TEXT NOT NULL,
+            views INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (week, code)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_movie_views_weekly_top ON movie_views_weekly (week, views DESC)')
+
+
+def _legacy_timestamp(value: Optional[str]) -> Optional[str]:
+    """filmbot.db dagi 'DD-MM-YYYY HH:MM:SS' vaqtini ISO ko'rinishiga keltirish"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%d-%m-%Y %H:%M:%S").strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return value
+
+
+def _011_merge_legacy_db(cursor: sqlite3.Cursor):
+    """Eski filmbot.db (users/movies, movie_* ustunlari) ma'lumotlarini bir marta ko'chirish"""
+    if not LEGACY_DB_PATH or not os.path.exists(LEGACY_DB_PATH):
+        return
+    if os.path.abspath(LEGACY_DB_PATH) == os.path.abspath(DB_PATH):
+        return
+
+    legacy = sqlite3.connect(f"file:{LEGACY_DB_PATH}?mode=ro", uri=True)
+    try:
+        tables = {row[0] for row in legacy.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        users = legacy.execute(
+            'SELECT user_id, full_name, username, phone_number, created_at FROM users'
+        ).fetchall() if 'users' in tables else []
+        movies = legacy.execute('''
+            SELECT movie_file, movie_desc, movie_code, created_at FROM movies
+            WHERE movie_file IS NOT NULL AND movie_desc IS NOT NULL AND movie_code IS NOT NULL
+            ORDER BY movie_id
+        ''').fetchall() if 'movies' in tables else []
+    finally:
+        legacy.close()
+
+    # Joriy bazadagi yozuvlar ustun turadi
+    before = cursor.connection.total_changes
+    cursor.executemany('''
+        INSERT OR IGNORE INTO users (user_id, full_name, username, phone_number, registered_at)
+        VALUES (?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+    ''', [(*user[:4], _legacy_timestamp(user[4])) for user in users])
+    users_added = cursor.connection.total_changes - before
+
+    movies_added = 0
+    for file_id, description, code, created_at in movies:
+        title, genre, year = parse_movie_meta(description)
+        cursor.execute('''
+            INSERT OR IGNORE INTO movies (file_id, description, code, created_at, title, genre, year)
+            VALUES (?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?)
+        ''', (file_id, description, str(code), _legacy_timestamp(created_at), title, genre, year))
+        movies_added += cursor.rowcount
+
+    logger.info("🛠 %s dan ko'chirildi: %s foydalanuvchi, %s film", LEGACY_DB_PATH, users_added, movies_added)
+
+
+def _012_broadcast_leases(cursor: sqlite3.Cursor):
+    # Bir nechta ishchi bitta vazifani parallel yubormasligi uchun ijara (lease)
+    _ensure_column(cursor, "broadcast_jobs", "owner", "TEXT")
+    _ensure_column(cursor, "broadcast_jobs", "lease_until", "REAL")
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "initial", _001_initial),
+    (2, "users_is_active", _002_users_is_active),
+    (3, "movie_meta", _003_movie_meta),
+    (4, "covering_indexes", _004_covering_indexes),
+    (5, "movies_fts", _005_movies_fts),
+    (6, "counters", _006_counters),
+    (7, "code_allocator", _007_code_allocator),
+    (8, "broadcast_jobs", _008_broadcast_jobs),
+    (9, "movie_parts", _009_movie_parts),
+    (10, "view_stats", _010_view_stats),
+    (11, "merge_legacy_db", _011_merge_legacy_db),
+    (12, "broadcast_leases", _012_broadcast_leases),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Qo'llanmagan migratsiyalarni bitta tranzaksiyada bajarish, yakuniy versiyani qaytaradi"""
+    if current_version(conn) >= LATEST_VERSION:
+        return LATEST_VERSION
+
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    cursor = conn.cursor()
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        # Boshqa ishchi qulfni kutayotganimizda migratsiya qilgan bo'lishi mumkin
+        version = current_version(conn)
+        for number, name, migration in MIGRATIONS:
+            if number <= version:
+                continue
+            migration(cursor)
+            cursor.execute('INSERT INTO schema_version (version, name) VALUES (?, ?)', (number, name))
+            logger.info("🛠 Migratsiya %03d_%s qo'llandi", number, name)
+        cursor.execute('COMMIT')
+    except Exception:
+        cursor.execute('ROLLBACK')
+        raise
+    finally:
+        conn.isolation_level = isolation_level
+
+    return LATEST_VERSION
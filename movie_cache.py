@@ -0,0 +1,110 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from config import MOVIE_CACHE_SIZE, MOVIE_CACHE_TTL
+
+
+class MovieCache:
+    """Jarayon ichidagi kod -> (file_id, description) keshi.
+
+    Hajmi cheklangan (LRU) va har bir yozuv TTL o'tgach eskiradi.
+    """
+
+    def __init__(self, maxsize: int = 5000, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self._codes: Optional[Set[str]] = None
+        self._data: "OrderedDict[str, Tuple[float, Tuple[str, str]]]" = OrderedDict()
+        self._parts: Dict[str, Tuple[str, ...]] = {}
+        self.parts_loaded = False
+
+    def get(self, code: str) -> Optional[Tuple[str, str]]:
+        """Keshdan filmni olish, topilmasa None"""
+        entry = self._data.get(code)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        expires_at, movie = entry
+        if expires_at < time.monotonic():
+            del self._data[code]
+            self.misses += 1
+            return None
+        
+        self._data.move_to_end(code)
+        self.hits += 1
+        return movie
+
+    def load_codes(self, codes: Iterable[str]):
+        """Mavjud kodlarning to'liq to'plamini o'rnatish"""
+        # Yuklash davomida put() qilingan yangi filmlar yo'qolmasligi uchun
+        self._codes = {str(code) for code in codes} | set(self._data)
+
+    def is_unknown(self, code: str) -> bool:
+        """Kod bazada yo'qligi aniq bo'lsa True (O(1), bazasiz)"""
+        if self._codes is None or code in self._codes:
+            return False
+        self.rejected += 1
+        return True
+
+    def put(self, code: str, file_id: str, description: str):
+        """Filmni keshga yozish"""
+        if self._codes is not None:
+            self._codes.add(code)
+        self._data[code] = (time.monotonic() + self.ttl, (file_id, description))
+        self._data.move_to_end(code)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def load_parts(self, rows: Iterable[Tuple[str, str]]):
+        """Ko'p qismli filmlarni (code, file_id) qatorlaridan yuklash.
+
+        Bunday filmlar kam, shuning uchun ular to'liq xotirada turadi va
+        bir qismli filmlar uchun bazaga qo'shimcha so'rov kerak bo'lmaydi.
+        """
+        parts: Dict[str, List[str]] = {}
+        for code, file_id in rows:
+            parts.setdefault(str(code), []).append(file_id)
+        self._parts = {code: tuple(file_ids) for code, file_ids in parts.items()}
+        self.parts_loaded = True
+
+    def set_parts(self, code: str, file_ids: Iterable[str]):
+        file_ids = tuple(file_ids)
+        if len(file_ids) > 1:
+            self._parts[code] = file_ids
+
+    def get_parts(self, code: str) -> Optional[Tuple[str, ...]]:
+        """Ko'p qismli film qismlari, bir qismli film uchun None"""
+        return self._parts.get(code)
+
+    def invalidate(self, code: Optional[str] = None):
+        """Bitta kodni yoki butun keshni tozalash"""
+        if code is None:
+            self._data.clear()
+        else:
+            self._data.pop(code, None)
+
+    def warm(self, movies: Iterable[Tuple[str, str, str]]):
+        """(code, file_id, description) qatorlari bilan keshni to'ldirish"""
+        for code, file_id, description in movies:
+            self.put(str(code), file_id, description)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+            "codes": len(self._codes) if self._codes is not None else None,
+            "multipart": len(self._parts),
+        }
+
+    def __len__(self):
+        return len(self._data)
+
+
+movie_cache = MovieCache(MOVIE_CACHE_SIZE, MOVIE_CACHE_TTL)
@@ -1,14 +1,16 @@
-import random
+CODE_START_LENGTH = 3
 
-def generate_move_code():
-    sonlar = []
+# Har bir uzunlik darajasidagi kodlar soni 9 * 10^(n-1) = 2^(n-1) * 3^2 * 5^(n-1),
+# shuning uchun 2, 3 va 5 ga bo'linmaydigan qadam indekslarni o'zaro bir qiymatli
+# aralashtiradi: ketma-ket filmlar ketma-ket kod olmaydi, lekin takrorlanish bo'lmaydi.
+_STEP = 7919
 
-    while len(sonlar) < 3:
-        son = random.randint(0, 9)
-        
-        if son not in sonlar:
-            sonlar.append(son)
 
-    kod = str(sonlar[0]) + str(sonlar[1]) + str(sonlar[2])
+def tier_size(length: int) -> int:
+    """Berilgan uzunlikdagi (0 bilan boshlanmaydigan) kodlar soni"""
+    return 9 * 10 ** (length - 1)
 
-    return kod
\ No newline at end of file
+def code_for_index(length: int, index: int) -> str:
+    """Daraja ichidagi tartib raqamini noyob kodga aylantirish"""
+    low = 10 ** (length - 1)
+    return str(low + (index * _STEP) % tier_size(length))
@@ -0,0 +1,84 @@
+import csv
+import os
+import tempfile
+from typing import AsyncIterator, List, Tuple
+
+from aiogram import types
+from aiogram.types import FSInputFile
+
+from broadcast import TokenBucket
+from repository import get_movies_page
+
+
+MESSAGE_LIMIT = 4000
+EXPORT_CHUNK_SIZE = 500
+
+
+async def iter_movies(chunk_size: int = EXPORT_CHUNK_SIZE) -> AsyncIterator[List[Tuple]]:
+    """Barcha filmlarni (id, code, title) bo'laklari sifatida oqimda olish"""
+    before_id = None
+    while True:
+        rows = await get_movies_page(chunk_size, before_id)
+        if not rows:
+            return
+        yield rows
+        before_id = rows[-1][0]
+
+
+async def pack_messages(header: str, limit: int = MESSAGE_LIMIT) -> AsyncIterator[str]:
+    """Film qatorlarini Telegram chegarasidan oshmaydigan xabarlarga joylash"""
+    parts = [header]
+    size = len(header)
+    number = 0
+
+    async for rows in iter_movies():
+        for _, code, title in rows:
+            number += 1
+            line = f"{number}. {title[:500]}\n   🔢 Kodi: <code>{code}</code>\n\n"
+            if size + len(line) > limit:
+                yield "".join(parts)
+                parts = []
+                size = 0
+            parts.append(line)
+            size += len(line)
+
+    if number and parts:
+        yield "".join(parts)
+
+
+async def send_movie_list(message: types.Message, rate: float = 1.0) -> int:
+    """/all ro'yxatini bir nechta xabar qilib tartib bilan yuborish"""
+    bucket = TokenBucket(rate, capacity=3)
+    sent = 0
+    async for text in pack_messages("🎬 BARCHA FILMLAR RO'YXATI:\n\n"):
+        await bucket.acquire()
+        await message.answer(text)
+        sent += 1
+    return sent
+
+
+async def send_movie_file(message: types.Message, fmt: str = "csv") -> int:
+    """Katalogni vaqtinchalik faylga oqim bilan yozib hujjat sifatida yuborish"""
+    fd, path = tempfile.mkstemp(suffix=f".{fmt}", prefix="movies_")
+    count = 0
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f) if fmt == "csv" else None
+            if writer:
+                writer.writerow(["code", "title"])
+            async for rows in iter_movies():
+                for _, code, title in rows:
+                    count += 1
+                    if writer:
+                        writer.writerow([code, title])
+                    else:
+                        f.write(f"{code}\t{title}\n")
+
+        if count:
+            await message.answer_document(
+                FSInputFile(path, filename=f"movies.{fmt}"),
+                caption=f"🎬 Jami: {count} ta film"
+            )
+        return count
+    finally:
+        os.remove(path)
@@ -0,0 +1,31 @@
+import re
+from typing import Optional, Tuple
+
+
+_YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+
+
+def parse_title(description: str) -> str:
+    """Tavsifning birinchi qatoridan film nomini olish"""
+    desc_lines = description.split('\n') if description else []
+    return desc_lines[0] if desc_lines and desc_lines[0] else "Nomsiz film"
+
+def parse_genre(description: str) -> str:
+    """Tavsifdagi "Janri:" qatoridan janrni olish"""
+    for line in (description or "").split('\n'):
+        if "Janri:" in line:
+            return line.split("Janri:")[1].strip()
+    return "Noma'lum"
+
+def parse_year(description: str) -> Optional[int]:
+    """Tavsifdagi "Yili" qatoridan chiqarilgan yilni olish"""
+    for line in (description or "").split('\n'):
+        if "Yil" in line or "yil" in line:
+            match = _YEAR_RE.search(line)
+            if match:
+                return int(match.group(0))
+    return None
+
+def parse_movie_meta(description: str) -> Tuple[str, str, Optional[int]]:
+    """Tavsifdan (title, genre, year) ni bir marta ajratib olish"""
+    return parse_title(description), parse_genre(description), parse_year(description)
@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from catalog import catalog
+from repository import get_movies_page, get_total_movies_count
+
+
+PAGE_SIZE = 10
+
+
+class PageCache:
+    """Tayyor sahifa matnlari keshi, katalog o'zgarganda tozalanadi"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._version = None
+        self._data: "OrderedDict[tuple, Tuple[str, InlineKeyboardMarkup]]" = OrderedDict()
+
+    def get(self, key: tuple) -> Optional[Tuple[str, InlineKeyboardMarkup]]:
+        if self._version != catalog.version:
+            self._data.clear()
+            self._version = catalog.version
+        page = self._data.get(key)
+        if page is not None:
+            self._data.move_to_end(key)
+        return page
+
+    def put(self, key: tuple, page: Tuple[str, InlineKeyboardMarkup]):
+        self._data[key] = page
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+page_cache = PageCache()
+
+
+def parse_page_callback(data: str) -> Tuple[int, Optional[int]]:
+    """"next_page_{page}_{cursor}" dan (page, cursor) ni olish"""
+    parts = data.split("_")
+    try:
+        page = int(parts[2])
+        cursor = int(parts[3])
+    except (IndexError, ValueError):
+        return 1, None
+    return page, cursor
+
+
+async def render_movie_page(page: int = 1, before_id: Optional[int] = None,
+                            after_id: Optional[int] = None) -> Optional[Tuple[str, InlineKeyboardMarkup]]:
+    """Sahifa matni va tugmalarini qaytaradi (keshdan yoki bazadan)"""
+    key = (page, before_id, after_id)
+    cached = page_cache.get(key)
+    if cached is not None:
+        return cached
+
+    rows = await get_movies_page(PAGE_SIZE + 1, before_id, after_id)
+    if after_id is not None:
+        has_next = True
+        rows = rows[-PAGE_SIZE:]
+    else:
+        has_next = len(rows) > PAGE_SIZE
+        rows = rows[:PAGE_SIZE]
+
+    if not rows:
+        return None
+
+    total_movies = await get_total_movies_count()
+    start_num = (page - 1) * PAGE_SIZE + 1
+    response = f"🎬 FILMLAR ({page}-sahifa) - Jami: {total_movies} ta\n\n"
+
+    for i, (_, code, title) in enumerate(rows, start_num):
+        response += f"{i}. {title}\n"
+        response += f"   🔢 Kodi: <code>{code}</code>\n\n"
+
+    keyboard_buttons = []
+
+    if page > 1:
+        keyboard_buttons.append([InlineKeyboardButton(
+            text="← Oldingi sahifa",
+            callback_data=f"prev_page_{page-1}_{rows[0][0]}"
+        )])
+
+    if has_next:
+        keyboard_buttons.append([InlineKeyboardButton(
+            text="Keyingi sahifa →",
+            callback_data=f"next_page_{page+1}_{rows[-1][0]}"
+        )])
+
+    result = (response, InlineKeyboardMarkup(inline_keyboard=keyboard_buttons))
+    page_cache.put(key, result)
+    return result
@@ -1,96 +1,89 @@
 import random
 from datetime import datetime
-from database import get_all_movies
+from catalog import catalog
+from popularity import popularity
+from repository import ensure_catalog
 
 class MovieStats:
+    _period_picks = {}
+    
     @staticmethod
-    def get_random_top_movies(count=5):
+    async def get_random_top_movies(count=5):
         """Tasodifiy top filmlarni qaytaradi"""
-        all_movies = get_all_movies()
-        
-        if not all_movies:
-            return []
-        
-        if count >= len(all_movies):
-            return random.sample(all_movies, len(all_movies))
-        
-        return random.sample(all_movies, count)
+        await ensure_catalog()
+        return catalog.sample(count)
+    
+    @staticmethod
+    def _period_pick(kind, period, count):
+        """Davr (kun/hafta) uchun deterministik tanlov, davr tugaguncha keshda"""
+        key = (period, count, catalog.version)
+        cached = MovieStats._period_picks.get(kind)
+        if cached and cached[0] == key:
+            return cached[1]
+        
+        movies = catalog.sample(count, random.Random(f"{kind}_{period}"))
+        MovieStats._period_picks[kind] = (key, movies)
+        return movies
     
     @staticmethod
-    def get_today_top_movies(count=3):
+    def _ranked(top, kind, period, count):
+        """Ko'rishlar reytingi, yetmasa davr uchun deterministik tanlov bilan to'ldiriladi"""
+        movies = []
+        for code, _ in top:
+            movie = catalog.get(code)
+            if movie is not None:
+                movies.append(movie)
+                if len(movies) == count:
+                    return movies
+        
+        chosen = {movie[0] for movie in movies}
+        for movie in MovieStats._period_pick(kind, period, count * 2):
+            if movie[0] not in chosen:
+                movies.append(movie)
+                if len(movies) == count:
+                    break
+        return movies
+    
+    @staticmethod
+    async def get_today_top_movies(count=3):
         """Bugungi top filmlarni qaytaradi"""
-        all_movies = get_all_movies()
-        
-        if not all_movies:
+        await ensure_catalog()
+        if not len(catalog):
             return []
         
         today = datetime.now().date()
-        random.seed(str(today))
-        
-        if count >= len(all_movies):
-            return random.sample(all_movies, len(all_movies))
-        
-        return random.sample(all_movies, count)
+        return MovieStats._ranked(popularity.today_top, "today", str(today), count)
     
     @staticmethod
-    def get_weekly_top_movies(count=5):
+    async def get_weekly_top_movies(count=5):
         """Haftalik top filmlarni qaytaradi"""
-        all_movies = get_all_movies()
-        
-        if not all_movies:
+        await ensure_catalog()
+        if not len(catalog):
             return []
         
-        week_number = datetime.now().isocalendar()[1]
-        random.seed(f"week_{week_number}")
-        
-        if count >= len(all_movies):
-            return random.sample(all_movies, len(all_movies))
-        
-        return random.sample(all_movies, count)
+        year, week_number, _ = datetime.now().isocalendar()
+        return MovieStats._ranked(popularity.weekly_top, "week", f"{year}_{week_number}", count)
     
     @staticmethod
-    def get_popular_by_genre():
-        """Janr bo'yicha mashhur filmlarni guruhlab qaytaradi"""
-        all_movies = get_all_movies()
-        
-        if not all_movies:
-            return {}
-        
-        genre_movies = {}
-        
-        for code, desc in all_movies:
-            genre = "Noma'lum"
-            for line in desc.split('\n'):
-                if "Janri:" in line:
-                    genre = line.split("Janri:")[1].strip()
-                    break
-            
-            if genre not in genre_movies:
-                genre_movies[genre] = []
-            
-            genre_movies[genre].append((code, desc))
-        
+    def get_popular_by_genre(movies):
+        """(code, title, genre) qatorlarini janr bo'yicha guruhlab qaytaradi"""
         result = {}
-        for genre, movies in genre_movies.items():
-            if len(movies) <= 2:
-                result[genre] = movies
-            else:
-                result[genre] = random.sample(movies, 2)
+        for code, title, genre in movies:
+            result.setdefault(genre or "Noma'lum", []).append((code, title, genre))
         
         return result
     
     @staticmethod
-    def get_recommended_movie(user_id=None):
+    async def get_recommended_movie(user_id=None):
         """Foydalanuvchi uchun tavsiya etilgan film"""
-        all_movies = get_all_movies()
-        
-        if not all_movies:
+        await ensure_catalog()
+        if not len(catalog):
             return None
         
         if user_id:
-            random.seed(str(user_id))
+            return catalog.choice(random.Random(str(user_id)))
         
-        return random.choice(all_movies)
+        return catalog.choice()
     
     @staticmethod
     def format_movie_stats(movies_list, title="🎬 Tasodifiy Top Filmlar"):
@@ -100,16 +93,7 @@ class MovieStats:
         
         response = f"{title}:\n\n"
         
-        for i, (code, desc) in enumerate(movies_list, 1):
-            desc_lines = desc.split('\n')
-            film_title = desc_lines[0] if desc_lines else "Nomsiz film"
-            
-            genre = "Noma'lum"
-            for line in desc_lines:
-                if "Janri:" in line:
-                    genre = line.split("Janri:")[1].strip()
-                    break
-            
+        for i, (code, film_title, genre) in enumerate(movies_list, 1):
             response += f"{i}. <b>{film_title}</b>\n"
             response += f"   🎭 {genre}\n"
             response += f"   🔢 Kodi: <code>{code}</code>\n\n"
@@ -127,13 +111,10 @@ class MovieStats:
         for genre, movies in genre_dict.items():
             response += f"<b>#{genre}</b>\n"
             
-            for code, desc in movies:
-                desc_lines = desc.split('\n')
-                film_title = desc_lines[0] if desc_lines else "Nomsiz film"
-                
+            for code, film_title, _ in movies:
                 response += f"   • {film_title}\n"
                 response += f"     🔢 Kodi: <code>{code}</code>\n"
             
             response += "\n"
         
-        return response
\ No newline at end of file
+        return response
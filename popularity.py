@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+import repository
+from config import VIEW_FLUSH_INTERVAL, VIEW_FLUSH_SIZE, VIEW_RETENTION_DAYS
+
+logger = logging.getLogger(__name__)
+
+
+def day_key(moment: datetime) -> str:
+    return moment.date().isoformat()
+
+
+def week_key(moment: datetime) -> str:
+    year, week, _ = moment.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class PopularityTracker:
+    """Film ko'rishlarini yig'ib, bazaga to'plam qilib yozuvchi kuzatuvchi.
+
+    record() faqat xotiradagi buferga qo'shadi, yozish fonda bajariladi.
+    Har bir yozuvdan keyin kunlik va haftalik top ro'yxatlar yangilanadi,
+    shuning uchun ularni o'qish sinxron va bazasiz.
+    """
+
+    def __init__(self, flush_interval: float = 5, flush_size: int = 500,
+                 top_size: int = 20, retention_days: int = 30):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.top_size = top_size
+        self.retention_days = retention_days
+        self.today_top: List[Tuple[str, int]] = []
+        self.weekly_top: List[Tuple[str, int]] = []
+        self._buffer: List[Tuple[str, int, str, str, str]] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._pruned_day: Optional[str] = None
+
+    def record(self, code: str, user_id: Optional[int] = None):
+        """Ko'rish hodisasini buferga qo'shish (await qilinmaydi)"""
+        now = datetime.now()
+        self._buffer.append((str(code), user_id, now.isoformat(sep=" ", timespec="seconds"),
+                             day_key(now), week_key(now)))
+        if len(self._buffer) >= self.flush_size:
+            self._wakeup.set()
+
+    def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.flush()
+                await self.refresh()
+                await self._prune()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Ko'rishlar statistikasi yangilanmadi: %s", e)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def flush(self) -> int:
+        """Buferdagi hodisalarni bazaga yozish"""
+        if not self._buffer:
+            return 0
+        events, self._buffer = self._buffer, []
+        if not await repository.record_views(events):
+            # Keyingi urinishda qayta yoziladi, baza uzoq ishlamasa eng eskilari tashlanadi
+            self._buffer[:0] = events[-self.flush_size * 20:]
+            return 0
+        return len(events)
+
+    async def refresh(self):
+        """Xotiradagi top ro'yxatlarni bazadagi hisoblagichlardan yangilash"""
+        now = datetime.now()
+        self.today_top = await repository.get_top_views("daily", day_key(now), self.top_size)
+        self.weekly_top = await repository.get_top_views("weekly", week_key(now), self.top_size)
+
+    async def _prune(self):
+        now = datetime.now()
+        if self._pruned_day == day_key(now):
+            return
+        cutoff = now - timedelta(days=self.retention_days)
+        await repository.prune_views(
+            day_key(cutoff), week_key(cutoff), cutoff.isoformat(sep=" ", timespec="seconds")
+        )
+        self._pruned_day = day_key(now)
+
+
+popularity = PopularityTracker(VIEW_FLUSH_INTERVAL, VIEW_FLUSH_SIZE, retention_days=VIEW_RETENTION_DAYS)
@@ -0,0 +1,293 @@
+import asyncio
+import functools
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterable, Optional, List, Set, Tuple
+
+import database
+from config import DB_PATH, DB_POOL_SIZE, MOVIE_CACHE_SIZE, REDIS_URL
+from movie_cache import movie_cache
+from catalog import catalog
+from movie_meta import parse_movie_meta
+from storage import RESYNC_EVENT, create_invalidation_bus
+from metrics import metrics
+
+
+class ConnectionPool:
+    """Uzoq yashaydigan SQLite ulanishlari havzasi.
+
+    Har bir ishchi oqim o'z ulanishini bir marta ochadi va qayta ishlatadi,
+    so'rovlar esa event loop'dan tashqarida bajariladi.
+    """
+
+    def __init__(self, db_path: str, size: int = 4):
+        self.db_path = db_path
+        self.size = size
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="db")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            database.apply_pragmas(conn)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _call(self, fn, args, kwargs):
+        conn = self._connection()
+        try:
+            return fn(*args, conn=conn, **kwargs)
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+
+    async def run(self, fn, *args, **kwargs):
+        """database.py funksiyasini havzadagi ulanish bilan bajarish"""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(
+                self._executor, functools.partial(self._call, fn, args, kwargs)
+            )
+        finally:
+            metrics.observe("db_query_seconds", time.perf_counter() - start, (("query", fn.__name__),))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                database.optimize(conn)
+                conn.close()
+            self._connections.clear()
+
+
+_pool: Optional[ConnectionPool] = None
+_registered_users: Optional[Set[int]] = None
+_users_added_before_load: Set[int] = set()
+_catalog_loading: Optional[asyncio.Future] = None
+invalidation_bus = create_invalidation_bus(REDIS_URL)
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        _pool = ConnectionPool(DB_PATH, DB_POOL_SIZE)
+    return _pool
+
+
+def close_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+async def get_user(user_id: int) -> Optional[Tuple]:
+    """Foydalanuvchini olish"""
+    return await get_pool().run(database.get_user, user_id)
+
+async def add_users(users: List[Tuple[int, str, str, str]]) -> bool:
+    """Foydalanuvchilar to'plamini bitta tranzaksiyada saqlash"""
+    success = await get_pool().run(database.add_users, users)
+    if success:
+        user_ids = [user[0] for user in users]
+        _apply_users_added(user_ids)
+        await invalidation_bus.publish("users_added", {"user_ids": user_ids})
+    return success
+
+def _apply_users_added(user_ids: Iterable[int]):
+    if _registered_users is not None:
+        _registered_users.update(user_ids)
+    else:
+        _users_added_before_load.update(user_ids)
+
+async def load_registered_users() -> int:
+    """Ro'yxatdan o'tganlar to'plamini bazadan bir marta yuklash"""
+    global _registered_users
+    user_ids = set(await get_pool().run(database.get_all_user_ids))
+    user_ids |= _users_added_before_load
+    _users_added_before_load.clear()
+    _registered_users = user_ids
+    return len(_registered_users)
+
+async def is_registered(user_id: int) -> bool:
+    """Foydalanuvchi ro'yxatdan o'tganmi (to'plam yuklangan bo'lsa bazasiz)"""
+    if _registered_users is not None:
+        return user_id in _registered_users
+    return await get_user(user_id) is not None
+
+async def add_movie(file_id: str, description: str, code: str, parts: Optional[List[str]] = None) -> bool:
+    """Film qo'shish (parts - ko'p qismli filmning barcha file_id lari)"""
+    title, genre, year = parse_movie_meta(description)
+    success = await get_pool().run(database.add_movie, file_id, description, code, (title, genre, year), parts)
+    if success:
+        _apply_movie_added(str(code), file_id, description, title, genre, parts)
+        await invalidation_bus.publish("movie_added", {
+            "code": str(code), "file_id": file_id, "description": description,
+            "title": title, "genre": genre, "parts": parts,
+        })
+    return success
+
+def _apply_movie_added(code: str, file_id: str, description: str, title: str, genre: str,
+                       parts: Optional[List[str]] = None):
+    movie_cache.put(code, file_id, description)
+    if parts:
+        movie_cache.set_parts(code, parts)
+    catalog.add(code, title, genre)
+
+async def handle_invalidation(event: str, data: dict):
+    """Boshqa ishchidan kelgan kesh yangilanishini qo'llash"""
+    if event == "movie_added":
+        _apply_movie_added(data["code"], data["file_id"], data["description"], data["title"], data["genre"],
+                           data.get("parts"))
+    elif event == "users_added":
+        _apply_users_added(data["user_ids"])
+    elif event == RESYNC_EVENT:
+        # Uzilish paytida kelmagan o'zgarishlar bazadan qayta o'qiladi
+        await warm_movie_cache()
+        await load_catalog()
+        await load_registered_users()
+
+async def get_movie_parts(code: str) -> List[str]:
+    """Ko'p qismli film qismlari (bir qismli film uchun bo'sh ro'yxat)"""
+    code = str(code)
+    parts = movie_cache.get_parts(code)
+    if parts is not None:
+        return list(parts)
+    if movie_cache.parts_loaded:
+        return []
+    parts = await get_pool().run(database.get_movie_parts, code)
+    movie_cache.set_parts(code, parts)
+    return parts
+
+async def get_file_ids_chunk(after_id: int, limit: int) -> List[Tuple]:
+    """Tekshirish uchun file_id lar bo'lagi"""
+    return await get_pool().run(database.get_file_ids_chunk, after_id, limit)
+
+async def allocate_movie_code() -> Optional[str]:
+    """Yangi noyob film kodini ajratish"""
+    return await get_pool().run(database.allocate_movie_code)
+
+async def get_movie_by_code(code: str) -> Optional[Tuple]:
+    """Filmni kod orqali olish (avval keshdan)"""
+    code = str(code)
+    movie = movie_cache.get(code)
+    if movie is not None:
+        return movie
+    if movie_cache.is_unknown(code):
+        return None
+    
+    movie = await get_pool().run(database.get_movie_by_code, code)
+    if movie:
+        movie_cache.put(code, *movie)
+    return movie
+
+async def get_all_movies() -> List[Tuple]:
+    """Barcha filmlarni olish"""
+    return await get_pool().run(database.get_all_movies)
+
+async def get_total_movies_count() -> int:
+    """Jami film soni"""
+    return await get_pool().run(database.get_total_movies_count)
+
+async def get_total_users_count() -> int:
+    """Jami foydalanuvchilar soni"""
+    return await get_pool().run(database.get_total_users_count)
+
+async def get_movies_page(limit: int, before_id: Optional[int] = None, after_id: Optional[int] = None) -> List[Tuple]:
+    """Keyset sahifalash bilan film olish"""
+    return await get_pool().run(database.get_movies_page, limit, before_id, after_id)
+
+async def warm_movie_cache() -> int:
+    """Ishga tushishda keshni eng so'nggi filmlar bilan to'ldirish"""
+    movies = await get_pool().run(database.get_movies_for_cache, MOVIE_CACHE_SIZE)
+    movie_cache.warm(reversed(movies))
+    codes = await get_pool().run(database.get_all_codes)
+    movie_cache.load_codes(codes)
+    parts = await get_pool().run(database.get_all_movie_parts)
+    movie_cache.load_parts(parts)
+    return len(movies)
+
+async def load_catalog() -> int:
+    """Statistika katalogini bazadan qurish (parallel chaqiruvlar bitta yuklashni kutadi)"""
+    global _catalog_loading
+    if _catalog_loading is None:
+        _catalog_loading = asyncio.ensure_future(_load_catalog())
+        _catalog_loading.add_done_callback(_catalog_load_done)
+    return await asyncio.shield(_catalog_loading)
+
+async def _load_catalog() -> int:
+    movies = await get_pool().run(database.get_catalog_movies)
+    catalog.load(movies)
+    return len(catalog)
+
+def _catalog_load_done(_future: asyncio.Future):
+    global _catalog_loading
+    _catalog_loading = None
+
+async def ensure_catalog():
+    """Fondagi yuklash hali tugamagan bo'lsa, katalog tayyor bo'lishini kutish"""
+    if not catalog.loaded:
+        await load_catalog()
+
+async def get_top_movies_by_genre(per_genre: int) -> List[Tuple]:
+    """Har bir janrdan eng so'nggi filmlar"""
+    return await get_pool().run(database.get_top_movies_by_genre, per_genre)
+
+async def search_movies(text: str, limit: int = 10) -> List[Tuple]:
+    """Nom va tavsif bo'yicha qidiruv"""
+    return await get_pool().run(database.search_movies, text, limit)
+
+async def create_broadcast_job(text: str, chat_id: int, message_id: int) -> Optional[int]:
+    """Reklama vazifasini yaratish"""
+    return await get_pool().run(database.create_broadcast_job, text, chat_id, message_id)
+
+async def get_unfinished_broadcast_jobs() -> List[Tuple]:
+    """Tugallanmagan reklama vazifalari"""
+    return await get_pool().run(database.get_unfinished_broadcast_jobs)
+
+async def claim_broadcast_job(job_id: int, owner: str, lease_seconds: float) -> bool:
+    """Vazifani lease_seconds ga egallash yoki ijarani uzaytirish"""
+    now = time.time()
+    return await get_pool().run(database.claim_broadcast_job, job_id, owner, now + lease_seconds, now)
+
+async def release_broadcast_job(job_id: int, owner: str) -> bool:
+    """Vazifa ijarasini bo'shatish"""
+    return await get_pool().run(database.release_broadcast_job, job_id, owner)
+
+async def iter_pending_recipients(job_id: int, chunk_size: int = 500) -> AsyncIterator[List[int]]:
+    """Hali yuborilmagan qabul qiluvchilarni bo'laklab olish"""
+    last_user_id = -1
+    while True:
+        user_ids = await get_pool().run(database.get_pending_recipients, job_id, last_user_id, chunk_size)
+        if not user_ids:
+            return
+        yield user_ids
+        last_user_id = user_ids[-1]
+
+async def mark_recipients(job_id: int, results: List[Tuple[int, str]]) -> bool:
+    """Yuborish natijalarini saqlash"""
+    return await get_pool().run(database.mark_recipients, job_id, results)
+
+async def finish_broadcast_job(job_id: int) -> dict:
+    """Reklama vazifasini yakunlash"""
+    return await get_pool().run(database.finish_broadcast_job, job_id)
+
+async def record_views(events: List[Tuple[str, int, str, str, str]]) -> bool:
+    """Ko'rish hodisalarini to'plam qilib yozish"""
+    return await get_pool().run(database.record_views, events)
+
+async def get_top_views(kind: str, period: str, limit: int) -> List[Tuple]:
+    """Kunlik/haftalik eng ko'p ko'rilganlar"""
+    return await get_pool().run(database.get_top_views, kind, period, limit)
+
+async def prune_views(before_day: str, before_week: str, before_time: str) -> bool:
+    """Eski ko'rish ma'lumotlarini tozalash"""
+    return await get_pool().run(database.prune_views, before_day, before_week, before_time)
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Ishga tushish bosqichlari davomiyligini yozib borish"""
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = started if started is not None else time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+
+    def mark(self, name: str, seconds: float):
+        self.stages.append((name, seconds))
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name, time.perf_counter() - start)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+class Readiness:
+    """Fonda bajariladigan ishga tushish vazifalari va ularning holati.
+
+    Bot update qabul qilishni darhol boshlaydi, keshlar esa tayyor
+    bo'lguncha handlerlar bazaga murojaat qiladi.
+    """
+
+    def __init__(self):
+        self._status: Dict[str, str] = {}
+        self._durations: Dict[str, float] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def run(self, name: str, job: Callable[[], Awaitable]) -> asyncio.Task:
+        """Vazifani fonda ishga tushirish va natijasini qayd etish"""
+        self._status[name] = "pending"
+        task = asyncio.create_task(self._run(name, job))
+        self._tasks[name] = task
+        return task
+
+    async def _run(self, name: str, job: Callable[[], Awaitable]):
+        start = time.perf_counter()
+        try:
+            result = await job()
+        except asyncio.CancelledError:
+            self._status[name] = "cancelled"
+            raise
+        except Exception as e:
+            self._status[name] = "failed"
+            logger.exception("❌ %s tayyorlanmadi: %s", name, e)
+            return None
+        finally:
+            self._durations[name] = time.perf_counter() - start
+        self._status[name] = "ready"
+        logger.info("✅ %s tayyor: %s (%.0f ms)", name, result, self._durations[name] * 1000)
+        return result
+
+    def is_ready(self, name: str) -> bool:
+        return self._status.get(name) == "ready"
+
+    async def wait(self, timeout: Optional[float] = None):
+        """Barcha vazifalar tugashini kutish"""
+        if self._tasks:
+            await asyncio.wait(list(self._tasks.values()), timeout=timeout)
+
+    async def cancel(self):
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def status(self) -> Dict[str, Tuple[str, Optional[float]]]:
+        return {name: (status, self._durations.get(name)) for name, status in self._status.items()}
+
+    def collect(self) -> Dict[Tuple[str, Tuple], float]:
+        """/metrics uchun holat qiymatlari"""
+        values = {}
+        for name, (status, duration) in self.status().items():
+            labels = (("component", name),)
+            values[("bot_startup_ready", labels)] = 1 if status == "ready" else 0
+            if duration is not None:
+                values[("bot_startup_seconds", labels)] = round(duration, 6)
+        return values
+
+
+def import_breakdown(module: str = "main", limit: int = 12) -> List[Tuple[str, float]]:
+    """Modulni alohida jarayonda -X importtime bilan yuklab, paketlar bo'yicha vaqtni hisoblash"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True
+    )
+    totals: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            self_us, _, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+            package = name.split(".")[0]
+            totals[package] = totals.get(package, 0.0) + int(self_us) / 1_000_000
+        except ValueError:
+            continue
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def format_report(timer: StartupTimer, readiness: Readiness,
+                  imports: Optional[List[Tuple[str, float]]] = None) -> str:
+    """--profile-startup hisobotini matn ko'rinishida tayyorlash"""
+    lines = ["⏱ Ishga tushish profili", ""]
+    if imports:
+        lines.append("Importlar (alohida jarayonda, paket bo'yicha):")
+        for package, seconds in imports:
+            lines.append(f"  {package:32} {seconds * 1000:9.1f} ms")
+        lines.append("")
+    lines.append("Bosqichlar:")
+    for name, seconds in timer.stages:
+        lines.append(f"  {name:32} {seconds * 1000:9.1f} ms")
+    lines.append("")
+    lines.append("Fon vazifalari:")
+    for name, (status, duration) in readiness.status().items():
+        shown = f"{duration * 1000:9.1f} ms" if duration is not None else "        -"
+        lines.append(f"  {name:32} {shown}  {status}")
+    return "\n".join(lines)
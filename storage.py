@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+
+logger = logging.getLogger(__name__)
+
+
+INVALIDATION_CHANNEL = "filmbot:invalidate"
+# Qayta ulangandan keyin handlerga yuboriladi: uzilish paytidagi xabarlar yo'qolgan bo'lishi mumkin
+RESYNC_EVENT = "resync"
+
+InvalidationHandler = Callable[[str, dict], Awaitable[None]]
+
+REDIS_SCHEMES = ("redis://", "rediss://", "unix://")
+
+
+def use_redis(url: str) -> bool:
+    """REDIS_URL bo'sh bo'lsa False, qo'llab-quvvatlanmaydigan sxemada xato"""
+    if not url:
+        return False
+    if not url.startswith(REDIS_SCHEMES):
+        # Xato yozilgan URL bilan FSM xotirada, shina esa Redis'da qolib ketmasligi uchun
+        raise ValueError(f"REDIS_URL sxemasi qo'llab-quvvatlanmaydi: {url.partition(':')[0]!r} "
+                         f"(kutilgan: {', '.join(REDIS_SCHEMES)})")
+    return True
+
+
+def create_fsm_storage(url: str = "") -> BaseStorage:
+    """FSM holatlari uchun omborni tanlash: REDIS_URL berilgan bo'lsa umumiy, aks holda xotirada"""
+    if use_redis(url):
+        from aiogram.fsm.storage.redis import RedisStorage
+
+        return RedisStorage.from_url(url)
+    return MemoryStorage()
+
+
+class InvalidationBus:
+    """Bitta jarayon uchun bo'sh shina: keshlar faqat mahalliy yangilanadi"""
+
+    async def start(self, handler: InvalidationHandler):
+        pass
+
+    async def publish(self, event: str, data: dict):
+        pass
+
+    async def close(self):
+        pass
+
+
+class RedisInvalidationBus(InvalidationBus):
+    """Redis pub/sub orqali boshqa ishchilarning keshlarini yangilash.
+
+    Har bir ishchi o'z xabarlarini instance_id orqali o'tkazib yuboradi,
+    chunki mahalliy kesh allaqachon write-through bilan yangilangan.
+    """
+
+    def __init__(self, url: str = "", client=None, channel: str = INVALIDATION_CHANNEL):
+        if client is None:
+            from redis.asyncio import Redis
+
+            client = Redis.from_url(url)
+        self.client = client
+        self.channel = channel
+        self.instance_id = uuid.uuid4().hex
+        self.reconnect_delay = 1.0
+        self.max_reconnect_delay = 30.0
+        self._task: Optional[asyncio.Task] = None
+        self._pubsub = None
+        self._subscribed = False
+
+    async def start(self, handler: InvalidationHandler):
+        self._pubsub = self.client.pubsub()
+        await self._pubsub.subscribe(self.channel)
+        self._task = asyncio.create_task(self._listen(handler))
+
+    async def _listen(self, handler: InvalidationHandler):
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    await self._dispatch(message, handler)
+                logger.warning("⚠️ Redis kanali yopildi, qayta ulanilmoqda")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("❌ Redis kanalidan uzildi: %s", e)
+            await self._resubscribe()
+
+    async def _dispatch(self, message: dict, handler: InvalidationHandler):
+        kind = message.get("type")
+        if kind == "subscribe":
+            # redis-py ham uzilishdan keyin o'zi qayta obuna bo'ladi; birinchisidan
+            # keyingi har bir tasdiq xabarlar o'tkazib yuborilgan bo'lishi mumkinligini bildiradi
+            if self._subscribed:
+                logger.info("🔄 Redis kanaliga qayta ulandi, keshlar qayta yuklanadi")
+                await self._call(handler, RESYNC_EVENT, {})
+            self._subscribed = True
+            return
+        if kind != "message":
+            return
+        try:
+            payload = json.loads(message["data"])
+        except (TypeError, ValueError) as e:
+            logger.error("Kesh yangilash xabarini o'qib bo'lmadi: %s", e)
+            return
+        if payload.get("source") == self.instance_id:
+            return
+        await self._call(handler, payload.get("event"), payload.get("data", {}))
+
+    async def _call(self, handler: InvalidationHandler, event: str, data: dict):
+        try:
+            await handler(event, data)
+        except Exception as e:
+            logger.error("Kesh yangilash xabarini qayta ishlashda xato (%s): %s", event, e)
+
+    async def _resubscribe(self):
+        delay = self.reconnect_delay
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                try:
+                    await self._pubsub.aclose()
+                except Exception:
+                    pass
+                self._pubsub = self.client.pubsub()
+                await self._pubsub.subscribe(self.channel)
+                return
+            except Exception as e:
+                delay = min(delay * 2, self.max_reconnect_delay)
+                logger.warning("⚠️ Redis'ga qayta ulanib bo'lmadi: %s (%.0f s dan keyin)", e, delay)
+
+    async def publish(self, event: str, data: dict):
+        payload = json.dumps({"source": self.instance_id, "event": event, "data": data})
+        try:
+            await self.client.publish(self.channel, payload)
+        except Exception as e:
+            logger.error("Kesh yangilash xabarini yuborishda xato: %s", e)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(self.channel)
+            await self._pubsub.aclose()
+        await self.client.aclose()
+
+
+def create_invalidation_bus(url: str = "") -> InvalidationBus:
+    if use_redis(url):
+        return RedisInvalidationBus(url)
+    return InvalidationBus()
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+
+class SubscriptionCache:
+    """Kanal a'zoligi natijalari uchun TTL kesh.
+
+    Obuna bo'lgan va bo'lmagan foydalanuvchilar alohida TTL bilan saqlanadi,
+    bitta foydalanuvchi uchun parallel tekshiruvlar bitta so'rovni bo'lishadi.
+    maxsize 0 yoki None bo'lsa kesh hajmi cheklanmaydi.
+    """
+
+    def __init__(self, positive_ttl: float = 600, negative_ttl: float = 30,
+                 maxsize: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[int, Tuple[float, bool]]" = OrderedDict()
+        self._inflight: Dict[int, asyncio.Future] = {}
+
+    async def get(self, user_id: int, fetch: Callable[[int], Awaitable[bool]],
+                  force: bool = False) -> bool:
+        """Obuna holatini keshdan yoki fetch(user_id) orqali olish"""
+        if not force:
+            entry = self._data.get(user_id)
+            if entry is not None:
+                expires_at, status = entry
+                if expires_at > self.clock():
+                    self._data.move_to_end(user_id)
+                    self.hits += 1
+                    return status
+                del self._data[user_id]
+        
+        self.misses += 1
+        task = self._inflight.get(user_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load(user_id, fetch))
+            self._inflight[user_id] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, user_id: int, fetch: Callable[[int], Awaitable[bool]]) -> bool:
+        try:
+            status = await fetch(user_id)
+            self.set(user_id, status)
+            return status
+        finally:
+            self._inflight.pop(user_id, None)
+
+    def set(self, user_id: int, status: bool):
+        ttl = self.positive_ttl if status else self.negative_ttl
+        self._data[user_id] = (self.clock() + ttl, status)
+        self._data.move_to_end(user_id)
+        if self.maxsize:
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[int] = None):
+        if user_id is None:
+            self._data.clear()
+        else:
+            self._data.pop(user_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "inflight": len(self._inflight),
+        }
@@ -0,0 +1,14 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# config.py .env talab qiladi, testlar esa haqiqiy bazaga tegmasligi kerak
+os.environ.setdefault("TOKEN", "123456:TEST")
+os.environ.setdefault("ADMIN_ID", "1")
+os.environ.setdefault("CHANNEL_USERNAME", "@test_channel")
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="filmbot-tests-"), "test.db")
+os.environ["LEGACY_DB_PATH"] = ""
+os.environ["REDIS_URL"] = ""
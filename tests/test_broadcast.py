@@ -0,0 +1,172 @@
+import asyncio
+import time
+
+import pytest
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+import database
+import repository
+from broadcast import BLOCKED, SENT, Broadcaster, BroadcastWorker, TokenBucket
+
+
+class FakeBot:
+    """send_message vaqtlarini va bir vaqtdagi chaqiruvlar sonini yozib boruvchi bot"""
+
+    def __init__(self, delay=0.0, retry_after=None, blocked=()):
+        self.delay = delay
+        self.retry_after = dict(retry_after or {})
+        self.blocked = set(blocked)
+        self.sent = []
+        self.attempts = {}
+        self.edits = []
+        self.active = 0
+        self.max_active = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.attempts[chat_id] = self.attempts.get(chat_id, 0) + 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            method = SendMessage(chat_id=chat_id, text=text)
+            if self.retry_after.get(chat_id):
+                seconds = self.retry_after.pop(chat_id)
+                raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=seconds)
+            if chat_id in self.blocked:
+                raise TelegramForbiddenError(method=method, message="Forbidden: bot was blocked by the user")
+            self.sent.append((chat_id, time.monotonic()))
+        finally:
+            self.active -= 1
+
+    async def edit_message_text(self, text, chat_id, message_id, **kwargs):
+        self.edits.append(text)
+
+
+async def chunks_of(user_ids, size=50):
+    for start in range(0, len(user_ids), size):
+        yield user_ids[start:start + size]
+
+
+def test_send_rate_stays_within_bucket():
+    rate, count = 200, 400
+
+    async def scenario():
+        bot = FakeBot()
+        broadcaster = Broadcaster(bot, rate=rate, workers=20)
+        stats = await broadcaster.run(chunks_of(list(range(1, count + 1))), "salom")
+        return bot, stats
+
+    bot, stats = asyncio.run(scenario())
+
+    assert stats.sent == count
+    times = sorted(moment for _, moment in bot.sent)
+    capacity = TokenBucket(rate).capacity
+    # Istalgan oynada capacity dan ortiq yuborilganlari rate bilan cheklangan
+    window = int(capacity) + 50
+    for i in range(len(times) - window):
+        assert times[i + window] - times[i] >= (window - capacity) / rate * 0.9
+    assert times[-1] - times[0] >= (count - capacity) / rate * 0.9
+
+
+def test_concurrency_stays_within_worker_count():
+    async def scenario():
+        bot = FakeBot(delay=0.005)
+        broadcaster = Broadcaster(bot, rate=100000, workers=5)
+        await broadcaster.run(chunks_of(list(range(1, 101))), "salom")
+        return bot
+
+    bot = asyncio.run(scenario())
+
+    assert len(bot.sent) == 100
+    assert bot.max_active <= 5
+    assert bot.max_active > 1
+
+
+def test_retry_after_pauses_bucket_and_retries_once():
+    async def scenario():
+        bot = FakeBot(retry_after={3: 1})
+        broadcaster = Broadcaster(bot, rate=1000, workers=1)
+        started = time.monotonic()
+        stats = await broadcaster.run(chunks_of([1, 2, 3, 4, 5]), "salom")
+        return bot, stats, started
+
+    bot, stats, started = asyncio.run(scenario())
+
+    assert stats.sent == 5
+    assert bot.attempts[3] == 2
+    assert all(bot.attempts[user_id] == 1 for user_id in (1, 2, 4, 5))
+    sent_at = dict(bot.sent)
+    assert sent_at[3] - started >= 1
+    assert sent_at[4] >= sent_at[3]
+
+
+def test_token_bucket_pause_blocks_acquire():
+    async def scenario():
+        bucket = TokenBucket(1000)
+        bucket.pause(0.2)
+        started = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) >= 0.19
+
+
+@pytest.fixture(scope="module")
+def broadcast_users():
+    database.init_db()
+    user_ids = list(range(1000, 1040))
+    assert database.add_users([(user_id, "Test", "test", "+998900000000") for user_id in user_ids])
+    yield user_ids
+    repository.close_pool()
+
+
+def test_worker_edits_status_with_progress(broadcast_users):
+    async def scenario():
+        bot = FakeBot(delay=0.01, blocked={broadcast_users[0]})
+        worker = BroadcastWorker(bot, rate=100000, workers=2, flush_size=5, progress_interval=0.05)
+        job_id = await repository.create_broadcast_job("salom", 1, 10)
+        await worker._process(job_id, "salom", 1, 10)
+        return bot, job_id
+
+    bot, job_id = asyncio.run(scenario())
+
+    progress = [text for text in bot.edits if text.startswith("📤 Reklama yuborilmoqda")]
+    assert progress
+    assert bot.edits[-1].startswith("✅ Reklama yuborish tugadi")
+    assert "👥 Jami: 40" in bot.edits[-1]
+    counts = database.finish_broadcast_job(job_id)
+    assert counts == {SENT: 39, BLOCKED: 1}
+
+
+def test_two_workers_send_each_job_once(broadcast_users):
+    async def scenario():
+        first, second = FakeBot(delay=0.002), FakeBot(delay=0.002)
+        workers = [BroadcastWorker(bot, rate=100000, workers=4, flush_size=5) for bot in (first, second)]
+        job_id = await repository.create_broadcast_job("salom", None, None)
+        await asyncio.gather(*(worker._process(job_id, "salom", None, None) for worker in workers))
+        return first, second, job_id
+
+    first, second, job_id = asyncio.run(scenario())
+
+    sent_users = [user_id for user_id, _ in first.sent + second.sent]
+    assert sent_users and len(sent_users) == len(set(sent_users))
+    assert not (first.sent and second.sent)
+    assert database.finish_broadcast_job(job_id) == {SENT: len(sent_users)}
+
+
+def test_expired_lease_can_be_taken_over(broadcast_users):
+    async def scenario():
+        return await repository.create_broadcast_job("salom", None, None)
+
+    job_id = asyncio.run(scenario())
+    now = time.time()
+
+    assert database.claim_broadcast_job(job_id, "a", now + 60, now)
+    assert not database.claim_broadcast_job(job_id, "b", now + 60, now)
+    assert database.claim_broadcast_job(job_id, "a", now + 120, now)
+    assert database.claim_broadcast_job(job_id, "b", now + 300, now + 121)
+    assert not database.release_broadcast_job(job_id, "a")
+    assert database.release_broadcast_job(job_id, "b")
+    assert database.claim_broadcast_job(job_id, "a", now + 60, now)
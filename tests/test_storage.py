@@ -0,0 +1,151 @@
+import asyncio
+import threading
+
+import fakeredis
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+from fakeredis import TcpFakeServer
+
+import database
+import repository
+from catalog import catalog
+from movie_cache import movie_cache
+from storage import RESYNC_EVENT, RedisInvalidationBus, use_redis
+
+
+class Recorder:
+    def __init__(self, delegate=None):
+        self.delegate = delegate
+        self.events = []
+        self.changed = asyncio.Event()
+
+    async def __call__(self, event, data):
+        if self.delegate is not None:
+            await self.delegate(event, data)
+        self.events.append((event, data))
+        self.changed.set()
+
+    async def wait_for(self, event, timeout=5.0):
+        async def until():
+            while not any(name == event for name, _ in self.events):
+                self.changed.clear()
+                await self.changed.wait()
+        await asyncio.wait_for(until(), timeout)
+
+
+def make_bus(server):
+    bus = RedisInvalidationBus(client=fakeredis.FakeAsyncRedis(server=server))
+    bus.reconnect_delay = 0.01
+    return bus
+
+
+async def wait_until(predicate, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def db():
+    database.init_db()
+    yield
+    repository.close_pool()
+
+
+def test_publish_is_applied_by_another_bus():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        sender, receiver = make_bus(server), make_bus(server)
+        own = Recorder()
+        await sender.start(own)
+        await receiver.start(repository.handle_invalidation)
+        await repository.load_registered_users()
+        try:
+            await sender.publish("movie_added", {
+                "code": "777001", "file_id": "file_777001", "description": "🎬 Nomi: Test",
+                "title": "Test", "genre": "#Drama", "parts": None,
+            })
+            await sender.publish("users_added", {"user_ids": [777001]})
+            await wait_until(lambda: movie_cache.get("777001") is not None)
+            await wait_until(lambda: 777001 in (repository._registered_users or ()))
+        finally:
+            await sender.close()
+            await receiver.close()
+        return own
+
+    own = asyncio.run(scenario())
+
+    assert movie_cache.get("777001") == ("file_777001", "🎬 Nomi: Test")
+    assert catalog.get("777001") == ("777001", "Test", "#Drama")
+    # Yuboruvchi o'z xabarini qayta qo'llamaydi
+    assert [event for event, _ in own.events if event != RESYNC_EVENT] == []
+
+
+@pytest.fixture
+def redis_url():
+    # Haqiqiy TCP ulanish: uzilish va qayta ulanish redis-py orqali o'tadi
+    server = TcpFakeServer(("127.0.0.1", 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"redis://127.0.0.1:{server.server_address[1]}/0"
+    server.shutdown()
+    server.server_close()
+
+
+def test_reconnect_resubscribes_and_requests_resync(redis_url):
+    async def scenario():
+        sender, receiver = RedisInvalidationBus(redis_url), RedisInvalidationBus(redis_url)
+        receiver.reconnect_delay = 0.01
+        handler = Recorder(repository.handle_invalidation)
+        await sender.start(Recorder())
+        await receiver.start(handler)
+        await repository.warm_movie_cache()
+        try:
+            await sender.publish("users_added", {"user_ids": [1]})
+            await handler.wait_for("users_added")
+            assert all(event != RESYNC_EVENT for event, _ in handler.events)
+
+            # Uzilish paytida qo'shilgan film xabari bu ishchiga yetib kelmaydi
+            await receiver._pubsub.connection.disconnect()
+            assert database.add_movie("file_888001", "🎬 Nomi: Offline", "888001", ("Offline", "#Drama", None))
+            await handler.wait_for(RESYNC_EVENT)
+            assert not movie_cache.is_unknown("888001")
+            assert catalog.get("888001") == ("888001", "Offline", "#Drama")
+
+            await sender.publish("users_added", {"user_ids": [2]})
+            await wait_until(lambda: ("users_added", {"user_ids": [2]}) in handler.events)
+        finally:
+            await sender.close()
+            await receiver.close()
+
+    asyncio.run(scenario())
+
+
+def test_fsm_state_is_shared_between_storages():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        first = RedisStorage(redis=fakeredis.FakeAsyncRedis(server=server))
+        second = RedisStorage(redis=fakeredis.FakeAsyncRedis(server=server))
+        key = StorageKey(bot_id=123456, chat_id=42, user_id=42)
+        try:
+            await first.set_state(key, "AdminStates:waiting_for_movie")
+            await first.set_data(key, {"parts": ["file_1", "file_2"]})
+            return await second.get_state(key), await second.get_data(key)
+        finally:
+            await first.close()
+            await second.close()
+
+    state, data = asyncio.run(scenario())
+
+    assert state == "AdminStates:waiting_for_movie"
+    assert data == {"parts": ["file_1", "file_2"]}
+
+
+def test_unsupported_redis_scheme_is_rejected():
+    assert use_redis("") is False
+    assert use_redis("redis://localhost:6379/0") is True
+    with pytest.raises(ValueError):
+        use_redis("redis:/localhost")
@@ -0,0 +1,118 @@
+import asyncio
+
+from subscription import SubscriptionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubFetch:
+    """get_chat_member o'rnidagi soxta tekshiruv: chaqiruvlarni sanaydi"""
+
+    def __init__(self, statuses=None, default=True, delay=0.0):
+        self.statuses = dict(statuses or {})
+        self.default = default
+        self.delay = delay
+        self.calls = []
+
+    async def __call__(self, user_id):
+        self.calls.append(user_id)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.statuses.get(user_id, self.default)
+
+
+def test_positive_and_negative_ttls_are_separate():
+    async def scenario():
+        clock = FakeClock()
+        cache = SubscriptionCache(positive_ttl=600, negative_ttl=30, clock=clock)
+        fetch = StubFetch({1: True, 2: False})
+
+        assert await cache.get(1, fetch) is True
+        assert await cache.get(2, fetch) is False
+        assert fetch.calls == [1, 2]
+
+        clock.now = 29
+        await cache.get(1, fetch)
+        await cache.get(2, fetch)
+        assert fetch.calls == [1, 2]
+
+        clock.now = 31
+        await cache.get(1, fetch)
+        await cache.get(2, fetch)
+        assert fetch.calls == [1, 2, 2]
+
+        clock.now = 601
+        await cache.get(1, fetch)
+        assert fetch.calls == [1, 2, 2, 1]
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_checks_share_one_call():
+    async def scenario():
+        cache = SubscriptionCache()
+        fetch = StubFetch(delay=0.01)
+
+        results = await asyncio.gather(*(cache.get(7, fetch) for _ in range(20)))
+
+        assert results == [True] * 20
+        assert fetch.calls == [7]
+        assert cache.stats()["inflight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_lru_eviction_when_full():
+    async def scenario():
+        cache = SubscriptionCache(maxsize=2)
+        fetch = StubFetch()
+
+        await cache.get(1, fetch)
+        await cache.get(2, fetch)
+        await cache.get(1, fetch)
+        await cache.get(3, fetch)
+        assert cache.stats()["size"] == 2
+
+        await cache.get(1, fetch)
+        await cache.get(2, fetch)
+        assert fetch.calls == [1, 2, 3, 2]
+
+    asyncio.run(scenario())
+
+
+def test_zero_maxsize_is_unbounded():
+    async def scenario():
+        cache = SubscriptionCache(maxsize=0)
+        fetch = StubFetch()
+
+        for user_id in range(100):
+            await cache.get(user_id, fetch)
+        for user_id in range(100):
+            await cache.get(user_id, fetch)
+
+        assert len(fetch.calls) == 100
+        assert cache.stats()["size"] == 100
+
+    asyncio.run(scenario())
+
+
+def test_forced_refresh_bypasses_cached_negative():
+    async def scenario():
+        cache = SubscriptionCache(negative_ttl=30)
+        fetch = StubFetch({5: False})
+
+        assert await cache.get(5, fetch) is False
+        # Foydalanuvchi kanalga a'zo bo'lib, check_sub tugmasini bosdi
+        fetch.statuses[5] = True
+        assert await cache.get(5, fetch) is False
+        assert await cache.get(5, fetch, force=True) is True
+        assert await cache.get(5, fetch) is True
+        assert fetch.calls == [5, 5]
+
+    asyncio.run(scenario())
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import os
+
+import pytest
+from aiogram import Bot, Dispatcher, F
+from aiohttp.test_utils import TestClient, TestServer
+
+from webhook import SECRET_HEADER, WebhookServer, derive_secret
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "webhook_update.json")
+SECRET = "test-secret"
+
+
+def recorded_update(update_id=None):
+    with open(FIXTURE, encoding="utf-8") as f:
+        update = json.load(f)
+    if update_id is not None:
+        update["update_id"] = update_id
+    return update
+
+
+class RecordingHandler:
+    """Xabarlarni yozib boruvchi, kerak bo'lsa release() gacha kutib turuvchi handler"""
+
+    def __init__(self, block=False):
+        self.released = asyncio.Event()
+        if not block:
+            self.released.set()
+        self.texts = []
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, message):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await self.released.wait()
+            self.texts.append(message.text)
+        finally:
+            self.active -= 1
+
+
+def run_server(scenario, handler_kwargs=None, max_concurrency=50):
+    async def runner():
+        handler = RecordingHandler(**(handler_kwargs or {}))
+        dp = Dispatcher()
+
+        async def on_message(message):
+            await handler(message)
+
+        dp.message.register(on_message, F.text)
+        bot = Bot("123456:TEST")
+        server = WebhookServer(dp, bot, "/webhook", SECRET, max_concurrency)
+        client = TestClient(TestServer(server.create_app()))
+        await client.start_server()
+        try:
+            await scenario(client, server, handler)
+        finally:
+            await client.close()
+            await bot.session.close()
+
+    asyncio.run(runner())
+
+
+async def post(client, body, secret=SECRET):
+    headers = {SECRET_HEADER: secret} if secret is not None else {}
+    data = body if isinstance(body, str) else json.dumps(body)
+    return await client.post("/webhook", data=data, headers=headers)
+
+
+async def wait_until(predicate, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_rejects_missing_or_wrong_secret():
+    async def scenario(client, server, handler):
+        assert (await post(client, recorded_update(), secret=None)).status == 401
+        assert (await post(client, recorded_update(), secret="wrong")).status == 401
+        assert (await post(client, recorded_update(), secret="")).status == 401
+        await asyncio.sleep(0.05)
+        assert handler.texts == []
+
+    run_server(scenario)
+
+
+def test_rejects_malformed_body():
+    async def scenario(client, server, handler):
+        assert (await post(client, "{not json")).status == 400
+        assert (await post(client, {"message": {"text": "no update_id"}})).status == 400
+
+    run_server(scenario)
+
+
+def test_recorded_update_reaches_handler():
+    async def scenario(client, server, handler):
+        response = await post(client, recorded_update())
+        assert response.status == 200
+        await wait_until(lambda: handler.texts == ["123"])
+
+    run_server(scenario)
+
+
+def test_semaphore_caps_concurrent_handlers():
+    async def scenario(client, server, handler):
+        for update_id in range(10):
+            assert (await post(client, recorded_update(update_id))).status == 200
+        await wait_until(lambda: handler.active == 3)
+        await asyncio.sleep(0.05)
+        assert handler.active == 3
+
+        handler.released.set()
+        await wait_until(lambda: len(handler.texts) == 10)
+        assert handler.max_active == 3
+
+    run_server(scenario, {"block": True}, max_concurrency=3)
+
+
+def test_drain_waits_for_inflight_and_rejects_new_posts():
+    async def scenario(client, server, handler):
+        for update_id in range(2):
+            assert (await post(client, recorded_update(update_id))).status == 200
+        await wait_until(lambda: handler.active == 2)
+
+        drain = asyncio.create_task(server.drain(timeout=5))
+        await asyncio.sleep(0.05)
+        assert not drain.done()
+        assert (await post(client, recorded_update(99))).status == 503
+
+        handler.released.set()
+        await asyncio.wait_for(drain, 2)
+        assert len(handler.texts) == 2
+
+    run_server(scenario, {"block": True})
+
+
+def test_secret_is_required_and_derived_consistently():
+    with pytest.raises(ValueError):
+        WebhookServer(Dispatcher(), None, "/webhook", "")
+    assert derive_secret("123456:TEST") == derive_secret("123456:TEST")
+    assert derive_secret("123456:TEST") != derive_secret("654321:TEST")
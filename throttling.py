@@ -0,0 +1,130 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, Message
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class UserRateLimiter:
+    """Har bir foydalanuvchi uchun sinxron token-bucket.
+
+    Tekshiruv await qilmaydi, shuning uchun chegaradan oshgan update
+    hech qanday handler yoki I/O ishlamasdan tashlab yuboriladi.
+    """
+
+    def __init__(self, rate: float, burst: float, maxsize: int = 100000):
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[int, Tuple[float, float]]" = OrderedDict()
+
+    def allow(self, user_id: int, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        entry = self._buckets.get(user_id)
+        if entry is None:
+            tokens = self.burst
+        else:
+            tokens, updated = entry
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            self._buckets.move_to_end(user_id)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[user_id] = (tokens, now)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return allowed
+
+
+class CallbackCoalescer:
+    """Qisqa oraliqda kelgan bir xil callback'larni birlashtirish"""
+
+    def __init__(self, window: float, maxsize: int = 100000):
+        self.window = window
+        self.maxsize = maxsize
+        self._seen: "OrderedDict[Tuple, float]" = OrderedDict()
+
+    def is_duplicate(self, key: Tuple, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        seen_at = self._seen.get(key)
+        if seen_at is not None and now - seen_at < self.window:
+            return True
+        self._seen[key] = now
+        self._seen.move_to_end(key)
+        while len(self._seen) > self.maxsize:
+            self._seen.popitem(last=False)
+        return False
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Flood nazorati: token-bucket va callback dedublikatsiyasi.
+
+    Outer middleware sifatida ulanadi, ya'ni filtrlar va handlerlardan
+    oldin ishlaydi. Rad etilgan callback'larga faqat answer() qaytariladi.
+    """
+
+    def __init__(self, rate: float, burst: float, callback_window: float,
+                 exempt: Iterable[int] = ()):
+        self.limiter = UserRateLimiter(rate, burst)
+        self.coalescer = CallbackCoalescer(callback_window)
+        self.exempt = set(exempt)
+        self._warned: "OrderedDict[int, float]" = OrderedDict()
+
+    async def __call__(self, handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+                       event: Any, data: Dict[str, Any]) -> Any:
+        user = getattr(event, "from_user", None)
+        if user is None or user.id in self.exempt:
+            return await handler(event, data)
+
+        now = time.monotonic()
+        if isinstance(event, CallbackQuery):
+            message_id = event.message.message_id if event.message else event.inline_message_id
+            if self.coalescer.is_duplicate((user.id, message_id, event.data), now):
+                metrics.inc("bot_throttled_total", (("reason", "duplicate"),))
+                await _answer_silently(event)
+                return None
+
+        if not self.limiter.allow(user.id, now):
+            metrics.inc("bot_throttled_total", (("reason", "rate_limit"),))
+            if isinstance(event, CallbackQuery):
+                await _answer_silently(event, "⏳ Juda tez! Biroz kuting.")
+            elif isinstance(event, Message) and self._should_warn(user.id, now):
+                logger.info("🚫 Foydalanuvchi %s cheklandi", user.id)
+                await event.answer("⏳ Juda ko'p so'rov yubordingiz. Iltimos, biroz kuting.")
+            return None
+
+        return await handler(event, data)
+
+    def _should_warn(self, user_id: int, now: float) -> bool:
+        """Cheklangan foydalanuvchini har 10 soniyada ko'pi bilan bir marta ogohlantirish"""
+        warned_at = self._warned.get(user_id)
+        if warned_at is not None and now - warned_at < 10:
+            return False
+        self._warned[user_id] = now
+        self._warned.move_to_end(user_id)
+        while len(self._warned) > 10000:
+            self._warned.popitem(last=False)
+        return True
+
+
+async def _answer_silently(callback: CallbackQuery, text: Optional[str] = None):
+    try:
+        await callback.answer(text)
+    except Exception as e:
+        logger.debug("Callback javobi yuborilmadi: %s", e)
+
+
+def setup_throttling(dp, rate: float, burst: float, callback_window: float,
+                     exempt: Iterable[int] = ()) -> ThrottlingMiddleware:
+    """Xabar va callback'lar uchun flood nazoratini ulash"""
+    middleware = ThrottlingMiddleware(rate, burst, callback_window, exempt)
+    dp.message.outer_middleware(middleware)
+    dp.callback_query.outer_middleware(middleware)
+    return middleware
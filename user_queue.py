@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+import repository
+from config import USER_FLUSH_DELAY, USER_FLUSH_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class UserWriteQueue:
+    """Foydalanuvchi yozuvlarini guruhlab saqlovchi write-behind navbat.
+
+    upsert() yozuvni navbatga qo'yadi va o'z guruhi commit bo'lguncha
+    kutadi, shuning uchun tasdiq xabari faqat saqlangandan keyin ketadi.
+    Guruh flush_delay soniya o'tganda yoki flush_size yozuv yig'ilganda yoziladi.
+    """
+
+    def __init__(self, flush_delay: float = 0.005, flush_size: int = 200):
+        self.flush_delay = flush_delay
+        self.flush_size = flush_size
+        self._pending: List[Tuple[Tuple[int, str, str, str], asyncio.Future]] = []
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def upsert(self, user_id: int, full_name: str, username: str, phone_number: str) -> bool:
+        """Foydalanuvchini qo'shish yoki yangilash, commit natijasini qaytaradi"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(((user_id, full_name, username, phone_number), future))
+        self._wakeup.set()
+        if len(self._pending) >= self.flush_size:
+            self._full.set()
+        return await future
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._pending:
+            await self._flush()
+
+    async def _loop(self):
+        while True:
+            await self._wakeup.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_delay)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            await self._flush()
+            if not self._pending:
+                self._wakeup.clear()
+
+    async def _flush(self):
+        batch, self._pending = self._pending[:self.flush_size], self._pending[self.flush_size:]
+        if len(self._pending) >= self.flush_size:
+            self._full.set()
+        if not batch:
+            return
+        try:
+            success = await repository.add_users([user for user, _ in batch])
+        except asyncio.CancelledError:
+            # To'xtatishda guruh yo'qolmasin, upsert takroran yozilsa ham zarari yo'q
+            self._pending[:0] = batch
+            raise
+        except Exception as e:
+            logger.error("❌ Foydalanuvchilar guruhi saqlanmadi: %s", e)
+            success = False
+        for _, future in batch:
+            if not future.done():
+                future.set_result(success)
+
+
+user_queue = UserWriteQueue(USER_FLUSH_DELAY, USER_FLUSH_SIZE)
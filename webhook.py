@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import signal
+from typing import Optional, Set
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+logger = logging.getLogger(__name__)
+
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def derive_secret(token: str) -> str:
+    """Bot tokenidan barqaror secret_token: bir nechta ishchi bir xil kalitni oladi"""
+    return hmac.new(token.encode(), b"filmbot-webhook-secret", hashlib.sha256).hexdigest()
+
+
+class WebhookServer:
+    """Telegram webhook'larini qabul qiluvchi aiohttp server.
+
+    Yangilanish darhol tasdiqlanadi va fonda cheklangan parallellik bilan
+    qayta ishlanadi; to'xtatishda ishlanayotgan yangilanishlar kutiladi.
+    """
+
+    def __init__(self, dp: Dispatcher, bot: Bot, path: str = "/webhook",
+                 secret: str = "", max_concurrency: int = 50):
+        if not secret:
+            raise ValueError("Webhook uchun maxfiy kalit (secret_token) majburiy")
+        self.dp = dp
+        self.bot = bot
+        self.path = path
+        self.secret = secret
+        self.max_pending = max_concurrency * 4
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        self._closing = False
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self.path, self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token.encode(), self.secret.encode()):
+            return web.Response(status=401)
+        
+        # Telegram 2xx bo'lmagan javobdan keyin yangilanishni qayta yuboradi
+        if self._closing or len(self._tasks) >= self.max_pending:
+            return web.Response(status=503)
+        
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": self.bot})
+        except Exception as e:
+            logger.warning("Noto'g'ri webhook so'rovi: %s", e)
+            return web.Response(status=400)
+        
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.Response()
+
+    async def _process(self, update: Update):
+        async with self._semaphore:
+            try:
+                await self.dp.feed_update(self.bot, update)
+            except Exception as e:
+                logger.error("Yangilanish %s ni qayta ishlashda xato: %s", update.update_id, e)
+
+    async def drain(self, timeout: float = 30):
+        """Yangi so'rovlarni rad etib, ishlanayotganlarini kutish"""
+        self._closing = True
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=timeout)
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot, url: str, path: str, secret: str,
+                      host: str, port: int, max_concurrency: int,
+                      stop_event: Optional[asyncio.Event] = None):
+    """Webhook serverini ishga tushirib, to'xtash signalini kutish"""
+    if not secret:
+        if not url:
+            # Webhook tashqarida o'rnatilgan bo'lsa, maxfiy kalitsiz har qanday POST qabul qilinardi
+            raise RuntimeError("Webhook rejimi uchun WEBHOOK_SECRET yoki WEBHOOK_URL kerak")
+        # Tasodifiy kalit bo'lsa, oxirgi set_webhook qilgan ishchidan boshqalari 401 qaytarardi
+        secret = derive_secret(bot.token)
+        logger.info("🔐 WEBHOOK_SECRET berilmagan, kalit bot tokenidan hosil qilindi")
+    server = WebhookServer(dp, bot, path, secret, max_concurrency)
+    runner = web.AppRunner(server.create_app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    
+    if url:
+        await bot.set_webhook(
+            url.rstrip("/") + path,
+            secret_token=secret,
+            allowed_updates=dp.resolve_used_update_types(),
+            max_connections=max_concurrency
+        )
+    logger.info("🌐 Webhook server: http://%s:%s%s", host, port, path)
+    
+    stop_event = stop_event or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    
+    try:
+        await stop_event.wait()
+    finally:
+        await server.drain()
+        await runner.cleanup()
+        await bot.session.close()